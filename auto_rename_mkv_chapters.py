@@ -13,90 +13,379 @@ import tempfile
 import re
 import shutil
 import platform
+import threading
+import functools
+import hashlib
+import struct
+import sqlite3
+import time
+import io
+import xml.etree.ElementTree as ET
+import html
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Literal
-from datetime import timedelta
+from typing import List, Dict, Optional, Tuple, Literal, Union, Callable
 # from pythonmonkey import require  # Moved to inside class to avoid import error in GUI
-from struct import unpack
+from array import array
 import asyncio
 from enum import Enum
 from dataclasses import dataclass
 
-# 添加ncm-afp目录到路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ncm-afp'))
+# pyncm依赖requests、加密库等，导入较慢，首次识别前才按需导入
+GetMatchTrackByFP = None
+_pyncm_lock = threading.Lock()
 
-try:
-    from pyncm.apis.track import GetMatchTrackByFP
-except ImportError:
-    print("错误: 未安装pyncm库，请运行: pip install pyncm")
-    sys.exit(1)
+# 启动阶段的后台任务（预先导入pyncm、检测工具），与参数解析、配置加载等重叠
+_STARTUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='startup')
 
 
+def _load_pyncm():
+    """导入pyncm并返回 GetMatchTrackByFP（只导入一次，可在后台线程中预先调用）"""
+    global GetMatchTrackByFP
+    with _pyncm_lock:
+        if GetMatchTrackByFP is None:
+            # 添加ncm-afp目录到路径
+            ncm_afp_dir = os.path.join(os.path.dirname(__file__), 'ncm-afp')
+            if ncm_afp_dir not in sys.path:
+                sys.path.insert(0, ncm_afp_dir)
+            from pyncm.apis.track import GetMatchTrackByFP as match_track
+            _configure_pyncm_session()
+            GetMatchTrackByFP = match_track
+        return GetMatchTrackByFP
+
+
+def _configure_pyncm_session():
+    """
+    pyncm 的请求共用一个 requests.Session；为其设置与 NET_CONCURRENCY 相同的连接池大小，
+    并在连接失败（如服务器已关闭的保活连接）时重试，而不是让该章节识别失败
+    """
+    try:
+        from pyncm import GetCurrentSession
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except ImportError:
+        return
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=NET_CONCURRENCY,
+                          max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.3))
+    session = GetCurrentSession()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def _require_pyncm():
+    """确保pyncm已导入（等待后台预导入完成），返回 GetMatchTrackByFP"""
+    try:
+        return _load_pyncm()
+    except ImportError:
+        print("错误: 未安装pyncm库，请运行: pip install pyncm")
+        sys.exit(1)
+
+
+@functools.lru_cache(maxsize=None)
+def _lxml_etree():
+    """
+    可选依赖：lxml基于libxml2，解析大量章节时更快；未安装时返回None（使用标准库ElementTree）
+    首次解析章节时才导入，不拖慢程序（尤其是GUI）启动
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        return None
+    return etree
+
+
+# 同时进行的指纹识别请求数上限：足以重叠网络往返等待，又不会对API造成突发压力
+NET_CONCURRENCY = 4
+
+# 指纹识别的网络请求共享一个常驻线程池，避免每批请求重复创建线程
+# （pyncm 的请求共用一个 requests.Session，连接保持复用，无需每次重新握手）
+_NET_POOL = ThreadPoolExecutor(max_workers=NET_CONCURRENCY, thread_name_prefix='pyncm')
+
+
+# Windows下启动子进程时不创建控制台窗口（其他平台为0）
+NO_WINDOW_FLAGS = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# 预先绑定隐藏窗口参数的subprocess.run，所有同步子进程调用统一走这里
+run_hidden = functools.partial(subprocess.run, creationflags=NO_WINDOW_FLAGS)
+
+# Windows下MKVToolNix的常见安装目录
+_WIN_MKVTOOLNIX_DIRS = (
+    r"C:\Program Files\MKVToolNix",
+    r"C:\Program Files (x86)\MKVToolNix",
+    os.path.expanduser(r"~\AppData\Local\Programs\MKVToolNix"),
+)
+
+# Windows下FFmpeg的常见路径（导入时一次性展开），按常见程度排序
+_WIN_FFMPEG_CANDIDATES = (
+    r"C:\ffmpeg\bin\ffmpeg.exe",
+    r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
+    os.path.expanduser(r"~\ffmpeg\bin\ffmpeg.exe"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _scan_tool_dirs(dirs: Tuple[str, ...]) -> Dict[str, str]:
+    """一次性扫描目录，返回 {小写文件名: 完整路径}，靠前目录中的同名文件优先"""
+    index = {}
+    for base_path in dirs:
+        try:
+            with os.scandir(base_path) as it:
+                for entry in it:
+                    name = entry.name.lower()
+                    if name not in index and entry.is_file():
+                        index[name] = entry.path
+        except OSError:
+            continue
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def _path_index() -> Dict[str, str]:
+    """
+    一次性扫描PATH中的所有目录，返回 {工具名: 完整路径}，靠前目录中的同名文件优先
+    
+    Windows下文件名忽略大小写，并按PATHEXT去掉可执行扩展名。
+    """
+    is_windows = platform.system() == 'Windows'
+    path_exts = set()
+    if is_windows:
+        path_exts = {ext.lower() for ext in os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').split(os.pathsep) if ext}
+    
+    index = {}
+    for directory in os.environ.get('PATH', os.defpath).split(os.pathsep):
+        if not directory:
+            continue
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if is_windows:
+                        name, ext = os.path.splitext(name.lower())
+                        if ext not in path_exts:
+                            continue
+                    if name not in index and entry.is_file():
+                        index[name] = entry.path
+        except OSError:
+            continue
+    return index
+
+
+@functools.lru_cache(maxsize=None)
 def find_tool_path(tool_name: str) -> Optional[str]:
-    """查找工具路径，支持Windows自动检测"""
-    # 首先检查系统PATH
-    tool_path = shutil.which(tool_name)
+    """查找工具路径，支持Windows自动检测（结果在进程内缓存）"""
+    is_windows = platform.system() == 'Windows'
+    # Windows下与 shutil.which 一致，当前目录优先于PATH（工具可直接放在程序旁边）
+    tool_path = shutil.which(tool_name, path=os.curdir) if is_windows else None
+    # 再检查系统PATH（使用预先建立的索引，不再逐目录查找）
+    if not tool_path:
+        tool_path = _path_index().get(tool_name.lower() if is_windows else tool_name)
+    if tool_path and not is_windows and not os.access(tool_path, os.X_OK):
+        # 索引命中的文件不可执行（极少见），交给 shutil.which 按完整规则查找
+        tool_path = shutil.which(tool_name)
     if tool_path:
         return tool_path
     
     # Windows特殊处理
-    if platform.system() == 'Windows':
+    if is_windows:
         # 常见的MKVToolNix安装路径
-        common_paths = [
-            r"C:\Program Files\MKVToolNix",
-            r"C:\Program Files (x86)\MKVToolNix",
-            os.path.expanduser(r"~\AppData\Local\Programs\MKVToolNix"),
-        ]
-        
-        for base_path in common_paths:
-            tool_full_path = os.path.join(base_path, f"{tool_name}.exe")
-            if os.path.exists(tool_full_path):
-                return tool_full_path
+        tool_full_path = _scan_tool_dirs(_WIN_MKVTOOLNIX_DIRS).get(f"{tool_name}.exe".lower())
+        if tool_full_path:
+            return tool_full_path
         
         # FFmpeg常见路径
         if tool_name == 'ffmpeg':
-            ffmpeg_paths = [
-                r"C:\ffmpeg\bin\ffmpeg.exe",
-                r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-                os.path.expanduser(r"~\ffmpeg\bin\ffmpeg.exe"),
-            ]
-            for path in ffmpeg_paths:
-                if os.path.exists(path):
-                    return path
+            # 命中第一个即返回
+            return next((path for path in _WIN_FFMPEG_CANDIDATES if os.path.isfile(path)), None)
     
     return None
 
 
+# 工具验证结果缓存：{工具路径: [mtime_ns, size]}，文件变化后自动失效
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'mkv_chapters')
+_TOOL_CACHE_FILE = os.path.join(_CACHE_DIR, 'tool_verify.json')
+_tool_cache: Optional[Dict[str, list]] = None
+_tool_cache_lock = threading.Lock()
+
+
+def _load_tool_cache() -> Dict[str, list]:
+    """加载工具验证缓存（每个进程只读取一次磁盘）"""
+    global _tool_cache
+    with _tool_cache_lock:
+        if _tool_cache is None:
+            try:
+                with open(_TOOL_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    _tool_cache = json.load(f)
+            except (OSError, ValueError):
+                _tool_cache = {}
+        return _tool_cache
+
+
+def _save_tool_cache():
+    """写回工具验证缓存，失败时静默忽略"""
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp_path = _TOOL_CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_tool_cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, _TOOL_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _stat_fingerprint(tool_path: str) -> Optional[list]:
+    """获取工具文件的 [mtime_ns, size]，文件不存在时返回None"""
+    try:
+        st = os.stat(tool_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _is_cached_ok(tool_path: str, fingerprint: Optional[list]) -> bool:
+    """工具文件未变化且之前验证成功过"""
+    return fingerprint is not None and _load_tool_cache().get(tool_path) == fingerprint
+
+
 def verify_tool(tool_path: str, tool_name: str) -> Tuple[bool, str]:
-    """验证工具是否可用"""
+    """验证工具是否可用（verify_tool_async 的同步封装）"""
+    # 缓存命中时直接返回，不必创建事件循环
+    if _is_cached_ok(tool_path, _stat_fingerprint(tool_path)):
+        return True, "OK"
+    return asyncio.run(verify_tool_async(tool_path, tool_name))
+
+
+async def verify_tool_async(tool_path: str, tool_name: str) -> Tuple[bool, str]:
+    """异步验证工具是否可用（结果按文件 mtime/size 缓存到磁盘）"""
+    fingerprint = _stat_fingerprint(tool_path)
+    if _is_cached_ok(tool_path, fingerprint):
+        return True, "OK"
+    
+    # Windows下先检查PE文件的版本资源，能确认是该工具时无需启动进程；
+    # 这只是静态检查（无法发现缺失的DLL等），结果不写入磁盘缓存，每次启动重新检查
+    if _inspect_binary(tool_path, tool_name):
+        return True, "OK"
+    
+    is_valid, msg = await _run_version_check(tool_path, tool_name)
+    
+    # 只缓存版本命令确认成功的结果，超时等不确定状态下次仍重新验证
+    if is_valid and msg == "OK" and fingerprint is not None:
+        cache = _load_tool_cache()
+        with _tool_cache_lock:
+            cache[tool_path] = fingerprint
+            _save_tool_cache()
+    return is_valid, msg
+
+
+_VS_VERSION_INFO = 'VS_VERSION_INFO'.encode('utf-16-le')
+
+# Windows主机可直接运行的PE机器类型（x64/ARM64上可运行32位x86程序，ARM64上可模拟x64）
+_PE_MACHINE_I386, _PE_MACHINE_AMD64, _PE_MACHINE_ARM64 = 0x014C, 0x8664, 0xAA64
+_PE_RUNNABLE_MACHINES = {
+    'x86': {_PE_MACHINE_I386},
+    'amd64': {_PE_MACHINE_AMD64, _PE_MACHINE_I386},
+    'arm64': {_PE_MACHINE_ARM64, _PE_MACHINE_AMD64, _PE_MACHINE_I386},
+}
+
+# 读取的版本资源节上限（正常只有几十KB）
+_PE_RSRC_MAX_SIZE = 4 * 1024 * 1024
+
+
+def _inspect_binary(tool_path: str, tool_name: str) -> bool:
+    """
+    不启动进程，通过读取PE文件确认其为指定工具（仅Windows）
+    
+    只读取文件头、节表和 .rsrc 资源节：要求机器类型可在本机运行，
+    并在 VS_VERSION_INFO 版本资源（UTF-16LE字符串）中找到工具名。
+    返回False表示无法确认，调用方应回退到运行版本命令
+    （ELF/Mach-O等其他格式总是返回False）。
+    """
+    if platform.system() != 'Windows':
+        return False
+    runnable = _PE_RUNNABLE_MACHINES.get(platform.machine().lower())
+    if not runnable:
+        return False
+    try:
+        with open(tool_path, 'rb') as f:
+            dos_header = f.read(64)
+            if len(dos_header) < 64 or not dos_header.startswith(b'MZ'):
+                return False
+            (pe_offset,) = struct.unpack_from('<I', dos_header, 0x3C)
+            f.seek(pe_offset)
+            # PE签名 + COFF文件头（Machine, NumberOfSections, ..., SizeOfOptionalHeader）
+            header = f.read(24)
+            if len(header) < 24 or header[:4] != b'PE\0\0':
+                return False
+            machine, section_count = struct.unpack_from('<HH', header, 4)
+            (optional_size,) = struct.unpack_from('<H', header, 20)
+            if machine not in runnable:
+                return False
+            f.seek(pe_offset + 24 + optional_size)
+            sections = f.read(40 * section_count)
+            for offset in range(0, len(sections) - 39, 40):
+                if sections[offset:offset + 8].rstrip(b'\0') != b'.rsrc':
+                    continue
+                raw_size, raw_pointer = struct.unpack_from('<II', sections, offset + 16)
+                f.seek(raw_pointer)
+                rsrc = f.read(min(raw_size, _PE_RSRC_MAX_SIZE))
+                pos = rsrc.find(_VS_VERSION_INFO)
+                if pos == -1:
+                    return False
+                # 版本资源只有几KB，仅在其范围内做忽略大小写的匹配
+                pattern = b''.join(
+                    re.escape(ch.encode('utf-16-le')) if not ch.isalpha()
+                    else b'[' + ch.lower().encode() + ch.upper().encode() + b']\x00'
+                    for ch in tool_name
+                )
+                return re.search(pattern, rsrc[pos:pos + 8192]) is not None
+            return False
+    except (OSError, struct.error):
+        return False
+
+
+async def _run_version_command(tool_path: str, version_args: List[str],
+                               capture: bool) -> Tuple[int, bytes, bytes]:
+    """执行版本命令，capture为False时丢弃输出；超时抛出 asyncio.TimeoutError"""
+    stream = asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL
+    proc = await asyncio.create_subprocess_exec(
+        tool_path, *version_args,
+        stdout=stream,
+        stderr=stream,
+        creationflags=NO_WINDOW_FLAGS
+    )
+    try:
+        # 增加超时时间到20秒，防止机械硬盘唤醒或杀毒软件扫描导致超时
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=20)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout or b'', stderr or b''
+
+
+@functools.lru_cache(maxsize=None)
+def _version_pattern(tool_name: str) -> 're.Pattern[bytes]':
+    """匹配工具名或"version"的字节正则（忽略大小写），按工具名缓存编译结果"""
+    return re.compile(re.escape(tool_name.encode('utf-8')) + rb'|version', re.IGNORECASE)
+
+
+async def _run_version_check(tool_path: str, tool_name: str) -> Tuple[bool, str]:
+    """运行工具的版本命令以验证其可用性"""
     try:
         # 对于FFmpeg，使用-version而不是--version（两者都支持但返回码不同）
         version_args = ['-version'] if tool_name == 'ffmpeg' else ['--version']
         
-        # Windows下隐藏窗口
-        startupinfo = None
-        if platform.system() == 'Windows':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-        result = subprocess.run(
-            [tool_path] + version_args,
-            capture_output=True,
-            text=True,
-            timeout=20,  # 增加超时时间到20秒，防止机械硬盘唤醒或杀毒软件扫描导致超时
-            startupinfo=startupinfo
-        )
+        # 常见情况下返回码为0即可确认可用，无需建立管道读取输出
+        returncode, _, _ = await _run_version_command(tool_path, version_args, capture=False)
+        if returncode == 0:
+            return True, "OK"
         
-        # 检查输出中是否包含版本信息（比返回码更可靠）
-        output = result.stdout + result.stderr
-        if tool_name in output.lower() or 'version' in output.lower():
+        # 返回码非0时再捕获输出，检查其中是否包含版本信息（部分工具打印版本后返回非0）
+        returncode, stdout, stderr = await _run_version_command(tool_path, version_args, capture=True)
+        pattern = _version_pattern(tool_name)
+        if pattern.search(stdout) or pattern.search(stderr):
             return True, "OK"
-        else:
-            # 如果返回码是0，即使没匹配到特定字符串也认为是成功的（兼容性）
-            if result.returncode == 0:
-                return True, "OK"
-            return False, f"工具返回错误码: {result.returncode}"
-    except subprocess.TimeoutExpired:
+        return False, f"工具返回错误码: {returncode}"
+    except asyncio.TimeoutError:
         # 超时也尝试认为成功，只要文件存在（可能是系统太卡）
         if os.path.exists(tool_path):
             print(f"⚠️ 警告: 验证 {tool_name} 超时，但文件存在，尝试继续使用。")
@@ -108,47 +397,154 @@ def verify_tool(tool_path: str, tool_name: str) -> Tuple[bool, str]:
         return False, f"验证失败: {e}"
 
 
-def check_dependencies():
-    """检查所有依赖工具"""
-    print("\n🔍 正在检查依赖工具...\n")
+# 指纹识别结果的磁盘缓存（SQLite，按最近使用时间淘汰）
+_FP_CACHE_FILE = os.path.join(_CACHE_DIR, 'fp.sqlite')
+_FP_CACHE_MAX_ENTRIES = 5000
+_fp_cache_conn = None
+_fp_cache_lock = threading.Lock()
+
+
+def _fp_cache_connection() -> Optional[sqlite3.Connection]:
+    """获取指纹缓存数据库连接（调用方需持有 _fp_cache_lock），不可用时返回None"""
+    global _fp_cache_conn
+    if _fp_cache_conn is None:
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            conn = sqlite3.connect(_FP_CACHE_FILE, check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS fp(hash TEXT PRIMARY KEY, json TEXT, ts INTEGER)')
+            conn.commit()
+            _fp_cache_conn = conn
+        except (OSError, sqlite3.Error):
+            _fp_cache_conn = False
+    return _fp_cache_conn or None
+
+
+def match_track_by_fp(fp: str, duration: int) -> Dict:
+    """带磁盘缓存的 GetMatchTrackByFP，以指纹哈希为键，命中时不发起网络请求"""
+    key = hashlib.blake2b(f"{duration}:{fp}".encode('utf-8'), digest_size=16).hexdigest()
     
-    tools = {
-        'ffmpeg': 'FFmpeg (音频提取)',
-        'mkvextract': 'MKVToolNix mkvextract (章节提取)',
-        'mkvpropedit': 'MKVToolNix mkvpropedit (章节更新)'
-    }
+    with _fp_cache_lock:
+        conn = _fp_cache_connection()
+        if conn:
+            try:
+                row = conn.execute('SELECT json FROM fp WHERE hash = ?', (key,)).fetchone()
+                if row:
+                    conn.execute('UPDATE fp SET ts = ? WHERE hash = ?', (int(time.time()), key))
+                    conn.commit()
+                    return json.loads(row[0])
+            except (sqlite3.Error, ValueError):
+                pass
+    
+    result = _require_pyncm()(fp, duration)
+    
+    # 只缓存识别成功的结果，未匹配的片段下次仍重新查询
+    if result.get('code') == 200 and result.get('data', {}).get('result'):
+        with _fp_cache_lock:
+            conn = _fp_cache_connection()
+            if conn:
+                try:
+                    conn.execute('INSERT OR REPLACE INTO fp(hash, json, ts) VALUES (?, ?, ?)',
+                                 (key, json.dumps(result, ensure_ascii=False), int(time.time())))
+                    conn.execute('DELETE FROM fp WHERE hash IN '
+                                 '(SELECT hash FROM fp ORDER BY ts DESC LIMIT -1 OFFSET ?)',
+                                 (_FP_CACHE_MAX_ENTRIES,))
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+    return result
+
+
+def _detect_tool(tool_name: str) -> Tuple[Optional[str], bool, str]:
+    """查找并验证单个工具，返回 (路径, 是否可用, 信息)"""
+    tool_path = find_tool_path(tool_name)
+    if not tool_path:
+        return None, False, "未找到"
+    is_valid, msg = verify_tool(tool_path, tool_name)
+    return tool_path, is_valid, msg
+
+
+DEPENDENCY_TOOLS = {
+    'ffmpeg': 'FFmpeg (音频提取)',
+    'mkvextract': 'MKVToolNix mkvextract (章节提取)',
+    'mkvpropedit': 'MKVToolNix mkvpropedit (章节更新)'
+}
+
+
+# 所有工具均可用时的检测结果，进程内复用（有缺失时不缓存，以便安装后重新检测）
+_DEPS_CACHE: Optional[Dict[str, Tuple[Optional[str], bool, str]]] = None
+
+
+def detect_tools() -> Dict[str, Tuple[Optional[str], bool, str]]:
+    """查找并验证所有依赖工具（不输出信息），返回 {工具名: (路径, 是否可用, 信息)}"""
+    global _DEPS_CACHE
+    if _DEPS_CACHE is not None:
+        return _DEPS_CACHE
+    # 各工具的查找和验证互不依赖，并行执行以重叠子进程等待时间
+    with ThreadPoolExecutor(max_workers=len(DEPENDENCY_TOOLS)) as executor:
+        # 所有结果都要等待，按提交顺序取回即可，无需 as_completed 逐个等待完成
+        results = dict(zip(DEPENDENCY_TOOLS, executor.map(_detect_tool, DEPENDENCY_TOOLS)))
+    if all(tool_path and is_valid for tool_path, is_valid, _ in results.values()):
+        _DEPS_CACHE = results
+    else:
+        # 路径查找结果同样在进程内缓存，一并清除，下次检测才能找到新安装的工具
+        find_tool_path.cache_clear()
+        _path_index.cache_clear()
+        _scan_tool_dirs.cache_clear()
+    return results
+
+
+def check_dependencies(detected: Optional[Dict[str, Tuple[Optional[str], bool, str]]] = None,
+                       quiet: bool = False):
+    """
+    检查所有依赖工具
+    
+    Args:
+        detected: 预先（如在后台线程中）调用 detect_tools() 得到的结果，为None时现场检测
+        quiet: 静默模式，只输出缺失工具的错误信息（逐项检查结果不再格式化输出）
+    """
+    results = detected if detected is not None else detect_tools()
     
     found_tools = {}
     missing_tools = []
+    # 检测结果已全部就绪，先收集所有输出行，最后一次性写出
+    lines = [] if quiet else ["\n🔍 正在检查依赖工具...\n"]
     
-    for tool_name, description in tools.items():
-        print(f"检查 {description}...", end=' ')
-        tool_path = find_tool_path(tool_name)
+    for tool_name, description in DEPENDENCY_TOOLS.items():
+        tool_path, is_valid, msg = results[tool_name]
+        
+        if tool_path and is_valid:
+            found_tools[tool_name] = tool_path
+        else:
+            missing_tools.append(tool_name)
+        
+        if quiet:
+            continue
         
         if tool_path:
-            is_valid, msg = verify_tool(tool_path, tool_name)
             if is_valid:
-                print(f"✅ 找到: {tool_path}")
-                found_tools[tool_name] = tool_path
+                lines.append(f"检查 {description}... ✅ 找到: {tool_path}")
             else:
-                print(f"❌ 无效: {msg}")
-                missing_tools.append(tool_name)
+                lines.append(f"检查 {description}... ❌ 无效: {msg}")
         else:
-            print(f"❌ 未找到")
-            missing_tools.append(tool_name)
+            lines.append(f"检查 {description}... ❌ 未找到")
     
     if missing_tools:
-        print(f"\n❌ 缺少以下工具: {', '.join(missing_tools)}")
-        print("\n请安装缺失的工具:")
-        print("  - FFmpeg: https://ffmpeg.org/download.html")
-        print("  - MKVToolNix: https://mkvtoolnix.download/")
-        print("\n或使用参数指定工具路径:")
-        print("  --ffmpeg 'C:/path/to/ffmpeg.exe'")
-        print("  --mkvextract 'C:/Program Files/MKVToolNix/mkvextract.exe'")
-        print("  --mkvpropedit 'C:/Program Files/MKVToolNix/mkvpropedit.exe'")
+        lines += [
+            f"\n❌ 缺少以下工具: {', '.join(missing_tools)}",
+            "\n请安装缺失的工具:",
+            "  - FFmpeg: https://ffmpeg.org/download.html",
+            "  - MKVToolNix: https://mkvtoolnix.download/",
+            "\n或使用参数指定工具路径:",
+            "  --ffmpeg 'C:/path/to/ffmpeg.exe'",
+            "  --mkvextract 'C:/Program Files/MKVToolNix/mkvextract.exe'",
+            "  --mkvpropedit 'C:/Program Files/MKVToolNix/mkvpropedit.exe'",
+        ]
+        print("\n".join(lines))
         return None
     
-    print("\n✅ 所有依赖工具已就绪\n")
+    if not quiet:
+        lines.append("\n✅ 所有依赖工具已就绪\n")
+        print("\n".join(lines))
     return found_tools
 
 
@@ -196,6 +592,42 @@ class RecognitionConfig:
             return chapter_start + (chapter_duration * self.percentage)
         
         return chapter_start + self.offset
+    
+    def calculate_sample_times(self, chapters: List['MKVChapter']) -> List[float]:
+        """
+        一次性计算所有章节的采样起始时间（结果与逐个调用 calculate_sample_time 相同）
+        
+        每个章节的时间字符串只解析一次，采样策略也只判断一次，循环内只剩算术运算
+        """
+        parse = MKVChapter.parse_time_to_seconds
+        starts = [parse(chapter.start_time) for chapter in chapters]
+        
+        if self.strategy not in (SamplingStrategy.MIDDLE, SamplingStrategy.END, SamplingStrategy.CUSTOM):
+            offset = self.offset
+            return [start + offset for start in starts]
+        
+        # 如果没有结束时间，假设章节长度为3分钟
+        ends = [parse(chapter.end_time) if chapter.end_time else start + 180
+                for chapter, start in zip(chapters, starts)]
+        
+        if self.strategy == SamplingStrategy.MIDDLE:
+            half = self.duration / 2
+            return [(start + end) / 2 - half for start, end in zip(starts, ends)]
+        
+        if self.strategy == SamplingStrategy.END:
+            duration = self.duration
+            return [max(start, end - duration - 5) for start, end in zip(starts, ends)]
+        
+        percentage = self.percentage
+        return [start + ((end - start) * percentage) for start, end in zip(starts, ends)]
+
+
+# 模板清理用的正则（模块级预编译，每个章节格式化时直接复用）
+_TRANS_NAME_RE = re.compile(r'[（(]?\{trans_name\}[）)]?')
+_WS_RE = re.compile(r'\s+')
+_EMPTY_PAREN_RE = re.compile(r'\s*[（(]\s*[）)]\s*')
+_TRAIL_DASH_RE = re.compile(r'\s*-\s*$')
+_TOKEN_RE = re.compile(r'\{(\w+)')
 
 
 class ChapterTemplate:
@@ -236,36 +668,48 @@ class ChapterTemplate:
             # 直接使用用户提供的模板字符串
             self.template = template
     
+    @property
+    def template(self) -> str:
+        return self._template
+    
+    @template.setter
+    def template(self, value: str):
+        # 设置模板时预先分析用到的变量，并准备好去掉译名部分的备用模板
+        self._template = value
+        self._tokens = frozenset(_TOKEN_RE.findall(value)) if value else frozenset()
+        if value and '{trans_name}' in value:
+            self._template_no_trans = _WS_RE.sub(' ', _TRANS_NAME_RE.sub('', value)).strip()
+        else:
+            self._template_no_trans = value
+    
     def set_custom_template(self, template_string: str):
         """设置自定义模板"""
         self.template = template_string
     
     def format(self, song_info: Dict) -> str:
         """格式化章节标题"""
-        # 准备模板变量
+        # 准备模板变量（artist_first只在模板用到时才计算）
+        artists = song_info.get('artists', '')
         variables = {
             'name': song_info.get('name', ''),
             'trans_name': song_info.get('transName', ''),
-            'artists': song_info.get('artists', ''),
-            'artist_first': song_info.get('artists', '').split(',')[0].strip() if song_info.get('artists') else '',
+            'artists': artists,
+            'artist_first': artists.split(',')[0].strip() if artists and 'artist_first' in self._tokens else '',
             'album': song_info.get('album', ''),
             'id': song_info.get('id', ''),
             'popularity': song_info.get('popularity', 0)
         }
         
-        # 智能处理译名
-        template = self.template
-        if '{trans_name}' in template and not variables['trans_name']:
-            # 如果模板中有译名但实际没有译名，移除相关部分
-            template = re.sub(r'[（(]?\{trans_name\}[）)]?', '', template)
-            template = re.sub(r'\s+', ' ', template).strip()
+        # 智能处理译名：没有译名时使用预先去掉译名部分的模板
+        template = self.template if variables['trans_name'] else self._template_no_trans
         
         try:
-            result = template.format(**variables)
+            # format_map 直接使用变量字典，省去 ** 解包再建一次字典
+            result = template.format_map(variables)
             # 清理多余的空格和标点
-            result = re.sub(r'\s*[（(]\s*[）)]\s*', '', result)  # 移除空括号
-            result = re.sub(r'\s+', ' ', result).strip()
-            result = re.sub(r'\s*-\s*$', '', result)  # 移除末尾的破折号
+            result = _EMPTY_PAREN_RE.sub('', result)  # 移除空括号
+            result = _WS_RE.sub(' ', result).strip()
+            result = _TRAIL_DASH_RE.sub('', result)  # 移除末尾的破折号
             return result
         except KeyError as e:
             print(f"  ⚠️  模板变量错误: {e}")
@@ -315,11 +759,19 @@ class ChapterTemplate:
         print()
 
 
+# 已解析的配置文件：{(绝对路径, mtime_ns, size): 配置}，文件修改后自动重新解析
+_config_cache: Dict[Tuple[str, int, int], Dict] = {}
+
+
 def load_config_file(config_path: str) -> Dict:
-    """加载配置文件"""
+    """加载配置文件（同一文件未修改时直接返回缓存结果，调用方不应修改返回值）"""
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        st = os.stat(config_path)
+        key = (os.path.abspath(config_path), st.st_mtime_ns, st.st_size)
+        if key not in _config_cache:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                _config_cache[key] = json.load(f)
+        return _config_cache[key]
     except FileNotFoundError:
         print(f"⚠️  配置文件不存在: {config_path}")
         return {}
@@ -330,25 +782,29 @@ def load_config_file(config_path: str) -> Dict:
 
 def merge_config_with_args(config: Dict, args) -> Dict:
     """合并配置文件和命令行参数（命令行参数优先）"""
+    rec = config.get('recognition') or {}
+    tools = config.get('tools') or {}
+    opts = config.get('options') or {}
     merged = {
         'mkv_file': args.mkv_file or config.get('mkv_file'),
         'output': args.output or config.get('output'),
         'template': args.template if args.template != 'default' else config.get('template', 'default'),
         'custom_template': config.get('custom_template'),
         'recognition': {
-            'strategy': args.strategy if args.strategy != 'start' else config.get('recognition', {}).get('strategy', 'start'),
-            'offset': args.offset if args.offset != 5.0 else config.get('recognition', {}).get('offset', 5.0),
-            'percentage': args.percentage if args.percentage != 0.5 else config.get('recognition', {}).get('percentage', 0.5),
-            'duration': args.duration if args.duration != 3 else config.get('recognition', {}).get('duration', 3)
+            'strategy': args.strategy if args.strategy != 'start' else rec.get('strategy', 'start'),
+            'offset': args.offset if args.offset != 5.0 else rec.get('offset', 5.0),
+            'percentage': args.percentage if args.percentage != 0.5 else rec.get('percentage', 0.5),
+            'duration': args.duration if args.duration != 3 else rec.get('duration', 3)
         },
         'tools': {
-            'ffmpeg': args.ffmpeg or config.get('tools', {}).get('ffmpeg'),
-            'mkvextract': args.mkvextract or config.get('tools', {}).get('mkvextract'),
-            'mkvpropedit': args.mkvpropedit or config.get('tools', {}).get('mkvpropedit')
+            'ffmpeg': args.ffmpeg or tools.get('ffmpeg'),
+            'mkvextract': args.mkvextract or tools.get('mkvextract'),
+            'mkvpropedit': args.mkvpropedit or tools.get('mkvpropedit')
         },
         'options': {
-            'no_backup': args.no_backup or config.get('options', {}).get('no_backup', False),
-            'skip_check': args.skip_check or config.get('options', {}).get('skip_check', False)
+            'no_backup': args.no_backup or opts.get('no_backup', False),
+            'skip_check': args.skip_check or opts.get('skip_check', False),
+            'quiet': args.quiet or opts.get('quiet', False)
         }
     }
     return merged
@@ -374,7 +830,8 @@ def create_default_config(config_path: str):
         },
         "options": {
             "no_backup": False,
-            "skip_check": False
+            "skip_check": False,
+            "quiet": False
         },
         "_comments": {
             "mkv_file": "MKV视频文件路径（也可通过命令行指定）",
@@ -387,7 +844,8 @@ def create_default_config(config_path: str):
             "recognition.duration": "采样时长（秒），建议3-5秒",
             "tools": "工具路径，null表示自动检测",
             "options.no_backup": "是否禁用自动备份",
-            "options.skip_check": "是否跳过工具检查"
+            "options.skip_check": "是否跳过工具检查",
+            "options.quiet": "静默模式，不输出逐项的工具检查结果"
         }
     }
     
@@ -429,18 +887,57 @@ class AFPInstance:
             print(f"Warning: Failed to pre-load AFP module: {e}")
             self.afp_module = None
 
+    def _generate_fp_func(self):
+        """返回JS端的GenerateFP函数"""
+        if self.afp_module is None:
+            # 预加载失败时在首次调用时加载，之后复用
+            from pythonmonkey import require
+            self.afp_module = require(self.afp_js_path)
+        return self.afp_module.GenerateFP
+    
     def generate_fingerprint(self, sample: list) -> str:
         """生成音频指纹"""
         assert len(sample) == self.SAMPLECOUNT, \
             f'期望 {self.SAMPLECOUNT} 个样本，实际收到 {len(sample)}'
         
+        generate_fp = self._generate_fp_func()
+        
+        # JS Promise只能在运行中的事件循环里转换为awaitable，因此保留一层最小的协程包装
         async def run():
-            if self.afp_module:
-                afp = self.afp_module
-            else:
-                from pythonmonkey import require
-                afp = require(self.afp_js_path)
-            return await afp.GenerateFP(sample)
+            return await generate_fp(sample)
+        
+        return self.event_loop.run_until_complete(run())
+    
+    def generate_fingerprints_batch(self, samples_list: List[list],
+                                    on_fingerprint: Optional[Callable[[Union[str, Exception]], None]] = None
+                                    ) -> List[Union[str, Exception]]:
+        """
+        批量生成音频指纹
+        
+        所有样本在同一个协程中依次交给JS处理，只进入一次事件循环。
+        
+        Args:
+            samples_list: 样本列表
+            on_fingerprint: 每个指纹生成后立即调用（如提交网络查询，与后续指纹生成重叠）
+        
+        Returns:
+            与 samples_list 一一对应的指纹，单个样本失败时对应位置为异常对象
+        """
+        generate_fp = self._generate_fp_func()
+        
+        async def run():
+            fingerprints = []
+            for sample in samples_list:
+                try:
+                    assert len(sample) == self.SAMPLECOUNT, \
+                        f'期望 {self.SAMPLECOUNT} 个样本，实际收到 {len(sample)}'
+                    fp = await generate_fp(sample)
+                except Exception as e:
+                    fp = e
+                fingerprints.append(fp)
+                if on_fingerprint is not None:
+                    on_fingerprint(fp)
+            return fingerprints
         
         return self.event_loop.run_until_complete(run())
 
@@ -459,22 +956,56 @@ class MKVChapter:
     @staticmethod
     def parse_time_to_seconds(time_str: str) -> float:
         """将时间字符串转换为秒数"""
-        parts = time_str.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = float(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
+        hours, minutes, seconds = time_str.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
     
     @staticmethod
     def format_seconds_to_time(seconds: float) -> str:
         """将秒数转换为时间字符串"""
-        td = timedelta(seconds=seconds)
-        hours, remainder = divmod(td.seconds, 3600)
-        minutes, secs = divmod(remainder, 60)
-        millisecs = td.microseconds // 1000
+        # 先按微秒取整再截断到毫秒，避免浮点误差（如1.001秒被截成1.000）
+        total_ms = round(seconds * 1_000_000) // 1000
+        hours, remainder = divmod(total_ms, 3_600_000)
+        minutes, remainder = divmod(remainder, 60_000)
+        secs, millisecs = divmod(remainder, 1000)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millisecs:03d}"
 
 
+def _trim_ms(time_str: Optional[str]) -> Optional[str]:
+    """截断时间字符串的小数部分，只保留3位（毫秒）"""
+    if time_str:
+        dot = time_str.find('.')
+        if dot != -1 and len(time_str) - dot > 4:
+            return time_str[:dot + 4]
+    return time_str
+
+
+# 章节XML模板（标题需先做XML转义）
+_CHAPTERS_XML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<!DOCTYPE Chapters SYSTEM "matroskachapters.dtd">\n'
+    '<Chapters>\n'
+    '  <EditionEntry>\n'
+)
+_CHAPTERS_XML_FOOTER = (
+    '  </EditionEntry>\n'
+    '</Chapters>'
+)
+_ATOM_TMPL_NO_END = (
+    '    <ChapterAtom>\n'
+    '      <ChapterUID>{uid}</ChapterUID>\n'
+    '      <ChapterTimeStart>{start}</ChapterTimeStart>\n'
+    '      <ChapterDisplay>\n'
+    '        <ChapterString>{title}</ChapterString>\n'
+    '        <ChapterLanguage>und</ChapterLanguage>\n'
+    '      </ChapterDisplay>\n'
+    '    </ChapterAtom>\n'
+)
+_ATOM_TMPL_WITH_END = _ATOM_TMPL_NO_END.replace(
+    '</ChapterTimeStart>\n',
+    '</ChapterTimeStart>\n      <ChapterTimeEnd>{end}</ChapterTimeEnd>\n'
+)
+
+
 class MKVChapterManager:
     """MKV章节管理器"""
     
@@ -489,9 +1020,6 @@ class MKVChapterManager:
         
         # 验证工具可用性
         self._verify_tools()
-        
-        # 验证工具可用性
-        self._verify_tools()
     
     def _verify_tools(self):
         """验证MKVToolNix工具可用性"""
@@ -509,60 +1037,54 @@ class MKVChapterManager:
         """从MKV文件中提取章节信息"""
         print(f"📖 正在提取章节信息: {self.mkv_file.name}")
         
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.xml', delete=False, encoding='utf-8') as tmp:
-            tmp_path = tmp.name
+        # 使用mkvextract提取章节，输出文件为'-'时直接写到stdout，无需临时文件
+        cmd = [self.mkvextract_path, str(self.mkv_file), 'chapters', '-']
+        result = run_hidden(cmd, capture_output=True)
         
-        try:
-            # 使用mkvextract提取章节
-            cmd = [self.mkvextract_path, str(self.mkv_file), 'chapters', tmp_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-            
-            if result.returncode != 0:
-                raise RuntimeError(f"提取章节失败: {result.stderr}")
-            
-            # 解析XML章节文件
-            with open(tmp_path, 'r', encoding='utf-8') as f:
-                xml_content = f.read()
-            
-            chapters = self._parse_chapter_xml(xml_content)
-            print(f"✅ 找到 {len(chapters)} 个章节")
-            return chapters
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        if result.returncode != 0:
+            # 只在出错时解码stderr
+            raise RuntimeError(f"提取章节失败: {result.stderr.decode('utf-8', errors='replace')}")
+        
+        # 直接解析原始字节，由XML解析器按声明的编码解码
+        chapters = self._parse_chapter_xml(result.stdout)
+        print(f"✅ 找到 {len(chapters)} 个章节")
+        return chapters
     
-    def _parse_chapter_xml(self, xml_content: str) -> List[MKVChapter]:
-        """解析章节XML内容"""
+    def _parse_chapter_xml(self, xml_content: Union[str, bytes]) -> List[MKVChapter]:
+        """解析章节XML内容（流式解析，每个ChapterAtom处理完即释放）"""
         chapters = []
         
-        # 使用正则表达式提取章节信息
-        chapter_pattern = re.compile(
-            r'<ChapterAtom>.*?<ChapterUID>(.*?)</ChapterUID>.*?'
-            r'<ChapterTimeStart>(.*?)</ChapterTimeStart>.*?'
-            r'(?:<ChapterTimeEnd>(.*?)</ChapterTimeEnd>.*?)?'
-            r'<ChapterDisplay>.*?<ChapterString>(.*?)</ChapterString>',
-            re.DOTALL
-        )
+        # 没有章节时mkvextract不输出任何内容
+        if not xml_content.strip():
+            return chapters
         
-        for match in chapter_pattern.finditer(xml_content):
-            uid = match.group(1)
-            start_time = match.group(2)
-            end_time = match.group(3) if match.group(3) else None
-            title = match.group(4)
-            
-            # Clean up time string (remove excessive precision, keep 3 decimal places)
-            if '.' in start_time:
-                parts = start_time.split('.')
-                if len(parts[1]) > 3:
-                    start_time = f"{parts[0]}.{parts[1][:3]}"
-            
-            if end_time and '.' in end_time:
-                parts = end_time.split('.')
-                if len(parts[1]) > 3:
-                    end_time = f"{parts[0]}.{parts[1][:3]}"
-            
-            chapters.append(MKVChapter(uid, start_time, end_time, title))
+        lxml_etree = _lxml_etree()
+        if lxml_etree is not None:
+            if isinstance(xml_content, str):
+                xml_content = xml_content.encode('utf-8')
+            # lxml只为ChapterAtom产生事件，无需逐个跳过子元素
+            events = lxml_etree.iterparse(io.BytesIO(xml_content), events=('end',), tag='ChapterAtom')
+            parse_error = lxml_etree.XMLSyntaxError
+        else:
+            stream = io.BytesIO(xml_content) if isinstance(xml_content, bytes) else io.StringIO(xml_content)
+            events = ET.iterparse(stream, events=('end',))
+            parse_error = ET.ParseError
+        
+        try:
+            for _, elem in events:
+                if elem.tag != 'ChapterAtom':
+                    continue
+                
+                uid = elem.findtext('ChapterUID', '')
+                # Clean up time string (remove excessive precision, keep 3 decimal places)
+                start_time = _trim_ms(elem.findtext('ChapterTimeStart', ''))
+                end_time = _trim_ms(elem.findtext('ChapterTimeEnd')) or None
+                title = elem.findtext('ChapterDisplay/ChapterString', '')
+                
+                chapters.append(MKVChapter(uid, start_time, end_time, title))
+                elem.clear()
+        except parse_error as e:
+            raise RuntimeError(f"解析章节XML失败: {e}")
         
         return chapters
     
@@ -582,10 +1104,10 @@ class MKVChapterManager:
         try:
             # 使用mkvpropedit更新章节
             cmd = [self.mkvpropedit_path, output_file, '--chapters', tmp_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+            result = run_hidden(cmd, capture_output=True)
             
             if result.returncode != 0:
-                raise RuntimeError(f"更新章节失败: {result.stderr}")
+                raise RuntimeError(f"更新章节失败: {result.stderr.decode('utf-8', errors='replace')}")
             
             print(f"✅ 章节信息已更新到: {Path(output_file).name}")
             
@@ -595,45 +1117,33 @@ class MKVChapterManager:
     
     def _generate_chapter_xml(self, chapters: List[MKVChapter]) -> str:
         """生成章节XML内容"""
-        xml_parts = [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            '<!DOCTYPE Chapters SYSTEM "matroskachapters.dtd">',
-            '<Chapters>',
-            '  <EditionEntry>'
+        atoms = [
+            (_ATOM_TMPL_WITH_END if chapter.end_time else _ATOM_TMPL_NO_END).format(
+                uid=chapter.uid,
+                start=chapter.start_time,
+                end=chapter.end_time,
+                title=html.escape(chapter.title, quote=False)
+            )
+            for chapter in chapters
         ]
-        
-        for chapter in chapters:
-            xml_parts.extend([
-                '    <ChapterAtom>',
-                f'      <ChapterUID>{chapter.uid}</ChapterUID>',
-                f'      <ChapterTimeStart>{chapter.start_time}</ChapterTimeStart>',
-            ])
-            
-            if chapter.end_time:
-                xml_parts.append(f'      <ChapterTimeEnd>{chapter.end_time}</ChapterTimeEnd>')
-            
-            xml_parts.extend([
-                '      <ChapterDisplay>',
-                f'        <ChapterString>{chapter.title}</ChapterString>',
-                '        <ChapterLanguage>und</ChapterLanguage>',
-                '      </ChapterDisplay>',
-                '    </ChapterAtom>'
-            ])
-        
-        xml_parts.extend([
-            '  </EditionEntry>',
-            '</Chapters>'
-        ])
-        
-        return '\n'.join(xml_parts)
+        return _CHAPTERS_XML_HEADER + ''.join(atoms) + _CHAPTERS_XML_FOOTER
 
 
 class AudioRecognizer:
     """音频识别器"""
     
+    # 单次FFmpeg调用最多处理的片段数（避免Windows命令行长度超限）
+    BATCH_SIZE: int = 20
+    # 同时运行的批量提取FFmpeg进程数上限
+    MAX_PARALLEL_BATCHES: int = 4
+    
     def __init__(self, afp_instance: AFPInstance, ffmpeg_path: str = "ffmpeg"):
         self.afp = afp_instance
         self.ffmpeg_path = ffmpeg_path
+        # 指纹 -> 进行中的查询Future，相同内容的章节（重复的歌曲、片头等）共用一次网络请求；
+        # 查询结束即移除：失败或未匹配的片段下次重新查询，成功的结果由指纹缓存提供
+        self._lookups: Dict[str, Future] = {}
+        self._lookups_lock = threading.Lock()
     
     def extract_audio_sample(self, video_file: str, start_time: float, 
                             duration: int = 3) -> Optional[list]:
@@ -654,33 +1164,182 @@ class AudioRecognizer:
         ]
         
         try:
-            result = subprocess.run(
+            result = run_hidden(
                 cmd,
                 capture_output=True,
                 check=True
             )
             
-            # 解析音频数据
-            buffer = result.stdout
-            expected_size = self.afp.SAMPLECOUNT * 4
-            
-            if len(buffer) < expected_size:
-                print(f"  ⚠️  音频数据不足: {len(buffer)} < {expected_size} 字节")
-                return None
-            
-            samples = list(unpack('<%df' % self.afp.SAMPLECOUNT, buffer[:expected_size]))
-            return samples
+            return self._decode_samples(result.stdout)
             
         except subprocess.CalledProcessError as e:
             print(f"  ❌ FFmpeg错误: {e.stderr.decode('utf-8', errors='ignore')}")
             return None
     
+    def extract_audio_samples_batch(self, video_file: str, start_times: List[float],
+                                    duration: int = 3) -> List[Optional[list]]:
+        """
+        用一次FFmpeg调用提取多个位置的音频样本
+        
+        每个采样位置作为一个带 -ss/-t 的输入（快速定位），拼接后经管道输出，
+        避免每个章节都启动一次FFmpeg。批量提取失败时回退为逐个提取。
+        
+        章节数超过 BATCH_SIZE 时，各批次的FFmpeg进程并行运行。
+        
+        Returns:
+            与 start_times 一一对应的样本列表，提取失败的位置为None
+        """
+        batches = [start_times[offset:offset + self.BATCH_SIZE]
+                   for offset in range(0, len(start_times), self.BATCH_SIZE)]
+        
+        samples_list = []
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_BATCHES, len(batches)) or 1,
+                                thread_name_prefix='ffmpeg') as pool:
+            # map 按提交顺序返回结果，保证与 start_times 对应
+            for batch_samples in pool.map(
+                    lambda batch: self.extract_audio_samples_group(video_file, batch, duration), batches):
+                samples_list.extend(batch_samples)
+        return samples_list
+    
+    def extract_audio_samples_group(self, video_file: str, start_times: List[float],
+                                    duration: int = 3) -> List[Optional[list]]:
+        """
+        用单个FFmpeg进程提取一组音频样本（最多 BATCH_SIZE 个位置，不另建线程池，
+        供已自行并行调度各组的调用方使用）
+        
+        各片段经滤镜统一为单声道f32并补齐/截断为 SAMPLECOUNT 个采样后按顺序拼接，
+        经管道一次性读回再按固定长度切分，无需临时文件。
+        拼接需要等长片段，因此每个采样附带一个标记声道（实际音频为1，补齐部分为0）：
+        靠近文件末尾不足时长的片段与逐个提取时一样返回None，不会把静音送去识别。
+        """
+        print(f"  🎵 批量提取 {len(start_times)} 个音频片段...")
+        
+        count = self.afp.SAMPLECOUNT
+        cmd = [self.ffmpeg_path]
+        filters = []
+        for i, start_time in enumerate(start_times):
+            cmd += ['-ss', str(start_time), '-t', str(duration), '-i', video_file]
+            filters.append(f'[{i}:a:0]aresample={self.afp.SAMPLERATE},'
+                           f'aformat=sample_fmts=flt:channel_layouts=mono,'
+                           f'aeval=exprs=val(0)|1:c=stereo,aformat=channel_layouts=stereo,'
+                           f'apad=whole_len={count},atrim=end_sample={count}[a{i}]')
+        labels = ''.join(f'[a{i}]' for i in range(len(start_times)))
+        filters.append(f'{labels}concat=n={len(start_times)}:v=0:a=1[out]')
+        cmd += [
+            '-filter_complex', ';'.join(filters),
+            '-map', '[out]',
+            '-acodec', 'pcm_f32le',
+            '-f', 'f32le',
+            '-'
+        ]
+        
+        result = run_hidden(cmd, capture_output=True)
+        # 每个采样两个声道（音频 + 标记）
+        size = count * 2 * 4
+        if result.returncode != 0 or len(result.stdout) != size * len(start_times):
+            print(f"  ⚠️  批量提取失败，改为逐个提取: "
+                  f"{result.stderr.decode('utf-8', errors='ignore').strip()[-200:]}")
+            return [self.extract_audio_sample(video_file, t, duration) for t in start_times]
+        
+        view = memoryview(result.stdout)
+        return [self._decode_marked_samples(view[offset:offset + size])
+                for offset in range(0, len(view), size)]
+    
+    def _decode_marked_samples(self, buffer: memoryview) -> Optional[list]:
+        """解析批量提取的一个片段（音频与标记声道交错），片段被补齐过（音频不足）时返回None"""
+        samples = array('f')
+        samples.frombytes(buffer)
+        if sys.byteorder != 'little':
+            samples.byteswap()
+        # 补齐只发生在片段末尾，检查最后一个采样的标记即可
+        if samples[-1] != 1.0:
+            print(f"  ⚠️  音频数据不足: 片段超出文件末尾")
+            return None
+        return samples[0::2].tolist()
+    
+    def _decode_samples(self, buffer: Union[bytes, memoryview]) -> Optional[list]:
+        """将f32le原始音频数据解析为样本列表，数据不足时返回None"""
+        expected_size = self.afp.SAMPLECOUNT * 4
+        
+        if len(buffer) < expected_size:
+            print(f"  ⚠️  音频数据不足: {len(buffer)} < {expected_size} 字节")
+            return None
+        
+        # array 直接按机器字节序解析float32，省去struct格式串和中间元组；
+        # 通过memoryview截取，不复制多余的输出数据
+        samples = array('f')
+        samples.frombytes(memoryview(buffer)[:expected_size])
+        if sys.byteorder != 'little':
+            samples.byteswap()
+        return samples.tolist()
+    
     def recognize_song(self, samples: list) -> Optional[Dict]:
         """识别歌曲"""
+        print(f"  🔍 生成音频指纹并识别...")
+        return self.resolve_recognition(self.submit_recognition(samples))
+    
+    def submit_recognition(self, samples: list) -> Future:
+        """
+        生成音频指纹，并把网络查询提交到共享线程池
+        
+        指纹生成在调用线程中完成，多个章节的网络请求可以并发进行。
+        指纹相同的章节直接复用已提交的查询。结果用 resolve_recognition() 取回。
+        """
         try:
-            print(f"  🔍 生成音频指纹并识别...")
             fp = self.afp.generate_fingerprint(samples)
-            result = GetMatchTrackByFP(fp, self.afp.DURATION)
+        except Exception as e:
+            fp = e
+        return self._submit_lookup(fp)
+    
+    def submit_recognitions(self, samples_list: List[Optional[list]]) -> List[Optional[Future]]:
+        """
+        submit_recognition() 的批量版本
+        
+        所有有效样本的指纹一次性生成（只进入一次JS事件循环），每个指纹生成后立即提交查询，
+        网络请求与其余指纹的生成重叠。样本为None的位置返回None。
+        """
+        valid = [samples for samples in samples_list if samples is not None]
+        lookups = []
+        try:
+            if valid:
+                self.afp.generate_fingerprints_batch(
+                    valid, on_fingerprint=lambda fp: lookups.append(self._submit_lookup(fp)))
+        except Exception as e:
+            # 事件循环本身出错：已提交的查询保留，其余位置带上该异常
+            lookups += [self._submit_lookup(e) for _ in range(len(valid) - len(lookups))]
+        lookups = iter(lookups)
+        return [next(lookups) if samples is not None else None for samples in samples_list]
+    
+    def _submit_lookup(self, fp: Union[str, Exception]) -> Future:
+        """提交指纹查询；指纹相同且查询仍在进行的章节复用同一个Future，指纹生成失败时返回带异常的Future"""
+        try:
+            if isinstance(fp, Exception):
+                raise fp
+            # 在锁外导入pyncm（首次导入较慢）；未安装时ImportError转为失败的Future，不退出进程
+            _load_pyncm()
+            with self._lookups_lock:
+                future = self._lookups.get(fp)
+                if future is not None:
+                    return future
+                future = self._lookups[fp] = _NET_POOL.submit(match_track_by_fp, fp, self.afp.DURATION)
+            # 在锁外注册：查询已完成时回调会立即在当前线程执行
+            future.add_done_callback(functools.partial(self._forget_lookup, fp))
+            return future
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+    
+    def _forget_lookup(self, fp: str, future: Future):
+        """查询结束后移除，之后相同指纹的章节重新查询"""
+        with self._lookups_lock:
+            if self._lookups.get(fp) is future:
+                del self._lookups[fp]
+    
+    def resolve_recognition(self, future: Future) -> Optional[Dict]:
+        """等待 submit_recognition() 的查询结果并解析为歌曲信息"""
+        try:
+            result = future.result()
             
             if result['code'] == 200 and result['data']['result']:
                 song_info = result['data']['result'][0]['song']
@@ -709,7 +1368,8 @@ class MKVAutoRename:
                  template: ChapterTemplate = None,
                  ffmpeg_path: str = "ffmpeg",
                  mkvextract_path: str = "mkvextract",
-                 mkvpropedit_path: str = "mkvpropedit"):
+                 mkvpropedit_path: str = "mkvpropedit",
+                 recognizer: Optional[AudioRecognizer] = None):
         """
         Args:
             mkv_file: MKV文件路径
@@ -718,14 +1378,18 @@ class MKVAutoRename:
             ffmpeg_path: FFmpeg可执行文件路径
             mkvextract_path: mkvextract可执行文件路径
             mkvpropedit_path: mkvpropedit可执行文件路径
+            recognizer: 已创建的识别器（处理多个文件时传入同一个，JS引擎只加载一次，
+                        重复片段的查询结果也可共用）；为None时按 ffmpeg_path 新建，传入时忽略 ffmpeg_path
         """
         self.mkv_file = mkv_file
         self.recognition_config = recognition_config or RecognitionConfig()
         self.template = template or ChapterTemplate('default')
         
         self.chapter_manager = MKVChapterManager(mkv_file, mkvextract_path, mkvpropedit_path)
-        self.afp = AFPInstance()
-        self.recognizer = AudioRecognizer(self.afp, ffmpeg_path)
+        if recognizer is None:
+            recognizer = AudioRecognizer(AFPInstance(), ffmpeg_path)
+        self.recognizer = recognizer
+        self.afp = recognizer.afp
     
     def process(self, output_file: str = None, backup: bool = True):
         """执行自动识别和重命名"""
@@ -750,31 +1414,29 @@ class MKVAutoRename:
         print(f"🎵 开始识别章节歌曲")
         print(f"{'='*60}\n")
         
+        # 计算所有章节的采样起始时间
+        sample_starts = self.recognition_config.calculate_sample_times(chapters)
+        
+        # 一次性提取所有章节的音频样本
+        all_samples = self.recognizer.extract_audio_samples_batch(self.mkv_file, sample_starts)
+        
+        # 批量生成指纹，网络查询在共享线程池中并发进行
+        pending = self.recognizer.submit_recognitions(all_samples)
+        
         updated_count = 0
-        for i, chapter in enumerate(chapters, 1):
+        for i, (chapter, sample_start, future) in enumerate(zip(chapters, sample_starts, pending), 1):
             print(f"\n[{i}/{len(chapters)}] 处理章节: {chapter.title}")
             print(f"  ⏱️  时间: {chapter.start_time}")
-            
-            # 计算采样起始时间
-            start_seconds = MKVChapter.parse_time_to_seconds(chapter.start_time)
-            end_seconds = MKVChapter.parse_time_to_seconds(chapter.end_time) if chapter.end_time else None
-            
-            sample_start = self.recognition_config.calculate_sample_time(
-                start_seconds, end_seconds
-            )
-            
             print(f"  📍 采样策略: {self.recognition_config.strategy.value}")
             print(f"  🎯 采样位置: {sample_start:.2f}s")
             
-            # 提取音频样本
-            samples = self.recognizer.extract_audio_sample(self.mkv_file, sample_start)
-            
-            if samples is None:
+            if future is None:
                 print(f"  ⚠️  跳过此章节")
                 continue
             
             # 识别歌曲
-            song_info = self.recognizer.recognize_song(samples)
+            print(f"  🔍 生成音频指纹并识别...")
+            song_info = self.recognizer.resolve_recognition(future)
             
             if song_info:
                 # 使用模板更新章节名称
@@ -810,7 +1472,7 @@ class MKVAutoRename:
         ]
         
         with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(chapters_data, f, ensure_ascii=False, indent=2)
+            f.write(json.dumps(chapters_data, ensure_ascii=False, indent=2))
         
         print(f"💾 已备份原始章节到: {backup_file.name}")
     
@@ -890,10 +1552,10 @@ class MKVAutoRename:
             
             # 使用mkvpropedit更新章节
             cmd = [mkvpropedit_path, str(mkv_path), '--chapters', str(temp_chapters_file)]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_hidden(cmd, capture_output=True)
             
             if result.returncode != 0:
-                raise RuntimeError(f"mkvpropedit执行失败: {result.stderr}")
+                raise RuntimeError(f"mkvpropedit执行失败: {result.stderr.decode('utf-8', errors='replace')}")
             
         finally:
             # 删除临时文件
@@ -985,6 +1647,8 @@ def main():
                             help='不备份原始章节信息')
     other_group.add_argument('--skip-check', action='store_true',
                             help='跳过依赖工具检查')
+    other_group.add_argument('-q', '--quiet', action='store_true',
+                            help='静默模式，不输出逐项的工具检查结果')
     other_group.add_argument('--restore', action='store_true',
                             help='从备份文件还原章节信息')
     other_group.add_argument('--backup-file',
@@ -992,6 +1656,10 @@ def main():
     
     args = parser.parse_args()
     
+    # 需要识别时在后台预先导入pyncm，与配置加载重叠
+    if not (args.restore or args.list_templates or args.show_variables or args.create_config):
+        _STARTUP_POOL.submit(_load_pyncm)
+    
     # 处理辅助命令
     if args.list_templates:
         ChapterTemplate.list_templates()
@@ -1051,6 +1719,12 @@ def main():
         parser.error("需要指定MKV文件路径（通过命令行或配置文件）")
         return
     
+    # 参数确认有效后，按合并后的配置（配置文件也可设置 skip_check）在后台检测工具，
+    # 与下面的模板创建、配置输出重叠；结果在开始处理前才取用
+    detect_future = None
+    if not merged_config['options']['skip_check']:
+        detect_future = _STARTUP_POOL.submit(detect_tools)
+    
     # 创建识别配置
     recognition_config = RecognitionConfig(
         strategy=SamplingStrategy(merged_config['recognition']['strategy']),
@@ -1078,7 +1752,8 @@ def main():
     
     # 自动检测工具路径
     if not merged_config['options']['skip_check']:
-        detected_tools = check_dependencies()
+        detected_tools = check_dependencies(detect_future.result(),
+                                            quiet=merged_config['options']['quiet'])
         if detected_tools is None:
             sys.exit(1)
         
@@ -1092,6 +1767,9 @@ def main():
         mkvextract_path = merged_config['tools']['mkvextract'] or 'mkvextract'
         mkvpropedit_path = merged_config['tools']['mkvpropedit'] or 'mkvpropedit'
     
+    # 开始处理前确保pyncm已导入完成（缺失时在此退出）
+    _require_pyncm()
+    
     try:
         renamer = MKVAutoRename(
             merged_config['mkv_file'],
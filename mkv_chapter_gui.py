@@ -1,11 +1,13 @@
 import sys
 import os
-import asyncio
 import json
 import subprocess
 import io
 import contextlib
 import traceback
+import threading
+from array import array
+from collections import deque
 from pathlib import Path
 from typing import List, Optional
 
@@ -15,13 +17,14 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 try:
     from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                    QHBoxLayout, QPushButton, QLabel, QFileDialog, 
-                                   QTableWidget, QTableWidgetItem, QSlider, QStyle,
+                                   QTableView, QSlider, QStyle,
                                    QMessageBox, QGroupBox, QFormLayout, QComboBox,
                                    QDoubleSpinBox, QSpinBox, QHeaderView, QSplitter,
                                    QProgressDialog, QLineEdit, QDialog, QDialogButtonBox,
-                                   QTextEdit, QMenu)
-    from PySide6.QtCore import Qt, QUrl, QThread, Signal, QTime, QTimer, QSize
-    from PySide6.QtGui import QAction, QIcon, QColor, QBrush, QFont
+                                   QPlainTextEdit, QMenu)
+    from PySide6.QtCore import (Qt, QUrl, QThread, Signal, QTime, QTimer, QSize,
+                                QAbstractTableModel, QModelIndex)
+    from PySide6.QtGui import QAction, QIcon, QColor, QBrush, QFont, QShortcut, QKeySequence
     from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
     from PySide6.QtMultimediaWidgets import QVideoWidget
 except ImportError:
@@ -32,7 +35,8 @@ except ImportError:
 try:
     from auto_rename_mkv_chapters import (MKVChapterManager, ChapterTemplate, 
                                           RecognitionConfig, SamplingStrategy,
-                                          find_tool_path, MKVChapter, check_dependencies)
+                                          find_tool_path, MKVChapter, check_dependencies,
+                                          detect_tools, MKVAutoRename, NO_WINDOW_FLAGS)
 except ImportError as e:
     print(f"错误: 无法导入核心模块: {e}")
     sys.exit(1)
@@ -105,16 +109,16 @@ QComboBox QAbstractItemView {
     selection-color: #ffffff;
     border: 1px solid #555;
 }
-QTableWidget {
+QTableView {
     background-color: #333;
     gridline-color: #444;
     border: 1px solid #555;
     color: #ffffff;
 }
-QTableWidget::item {
+QTableView::item {
     padding: 5px;
 }
-QTableWidget::item:selected {
+QTableView::item:selected {
     background-color: #0078d4;
     color: #ffffff;
 }
@@ -150,13 +154,119 @@ QScrollBar::handle:vertical {
     min-height: 20px;
     border-radius: 5px;
 }
-QTextEdit {
+QPlainTextEdit {
     background-color: #2b2b2b;
     color: #ffffff;
     border: 1px solid #555;
 }
 """
 
+# ==========================================
+# Models
+# ==========================================
+
+class ChapterTableModel(QAbstractTableModel):
+    """
+    Chapter table contents: time, original title, recognized title (editable), status.
+    Cells are served from plain lists, so no per-cell item objects are created.
+    """
+
+    HEADERS = ["时间", "原始标题", "识别结果 (可编辑)", "状态"]
+    COL_TIME, COL_TITLE, COL_RESULT, COL_STATUS = range(4)
+
+    # Status per row: None (pending), True (recognized) or False (failed)
+    STATUS_TEXT = {None: "待处理", True: "✅ 成功", False: "❌ 失败"}
+    STATUS_BRUSH = {True: QBrush(QColor("#00ff00")), False: QBrush(QColor("#ff0000"))}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chapters = []
+        self.titles = []
+        self.statuses = []
+        # Rows whose title would differ from the original chapter title if saved
+        self.changed_rows = set()
+
+    def set_chapters(self, chapters):
+        """Show a new chapter list with empty results"""
+        self.beginResetModel()
+        self.chapters = chapters
+        self.titles = [""] * len(chapters)
+        self.statuses = [None] * len(chapters)
+        self.changed_rows = set()
+        self.endResetModel()
+
+    def set_saved_chapters(self, chapters):
+        """The chapters now in the file (same rows, new titles), keeping the results"""
+        self.chapters = chapters
+        for row in range(len(chapters)):
+            self._update_changed(row)
+        if chapters:
+            self.dataChanged.emit(self.index(0, self.COL_TITLE),
+                                  self.index(len(chapters) - 1, self.COL_TITLE))
+
+    def _update_changed(self, row):
+        title = self.titles[row]
+        if title.strip() and title != self.chapters[row].title:
+            self.changed_rows.add(row)
+        else:
+            self.changed_rows.discard(row)
+
+    def set_results(self, results):
+        """
+        Record recognition results ({row: title}, an empty title means it failed and
+        keeps the current title) with a single dataChanged over the rows touched
+        """
+        if not results:
+            return
+        for row, title in results.items():
+            if title:
+                self.titles[row] = title
+                self._update_changed(row)
+            self.statuses[row] = bool(title)
+        self.dataChanged.emit(self.index(min(results), self.COL_RESULT),
+                              self.index(max(results), self.COL_STATUS))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.chapters)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == self.COL_TIME:
+                return self.chapters[row].start_time
+            if col == self.COL_TITLE:
+                return self.chapters[row].title
+            if col == self.COL_RESULT:
+                return self.titles[row]
+            return self.STATUS_TEXT[self.statuses[row]]
+        if role == Qt.ForegroundRole and col == self.COL_STATUS:
+            return self.STATUS_BRUSH.get(self.statuses[row])
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() != self.COL_RESULT:
+            return False
+        self.titles[index.row()] = value
+        self._update_changed(index.row())
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.COL_RESULT:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
 # ==========================================
 # Worker Threads
 # ==========================================
@@ -169,6 +279,16 @@ class RecognitionWorker(QThread):
     error_occurred = Signal(str)
     log_message = Signal(str)
 
+    # Seconds to wait for one chapter before the worker process is killed
+    CHAPTER_TIMEOUT = 30
+
+    # The worker process is shared by all RecognitionWorker runs (only one runs at a
+    # time), so recognizing again does not reload the JS engine; it exits on its own
+    # when the GUI closes its stdin
+    proc = None
+    stderr_thread = None
+    stderr_tail = deque(maxlen=20)
+
     def __init__(self, mkv_file, chapters, config, template, tools):
         super().__init__()
         self.mkv_file = mkv_file
@@ -177,103 +297,221 @@ class RecognitionWorker(QThread):
         self.template = template
         self.tools = tools
         self.is_running = True
+        # Log lines waiting to be sent to the GUI as one log_message
+        self._log_buf = []
+
+    def _log(self, message):
+        self._log_buf.append(message)
+
+    def _flush_log(self):
+        """Emit the buffered log lines with a single cross-thread signal"""
+        if self._log_buf:
+            self.log_message.emit('\n'.join(self._log_buf))
+            self._log_buf.clear()
+
+    @classmethod
+    def ensure_server(cls):
+        """Start the worker unless it is already running (it loads the JS engine right away,
+        so starting it early takes that wait off the first recognition)"""
+        if cls.proc is None or cls.proc.poll() is not None:
+            cls._start_server()
+
+    @classmethod
+    def _start_server(cls):
+        """Launch the recognition worker once in --server mode"""
+        if getattr(sys, 'frozen', False):
+            # Running as compiled exe
+            # Assume recognition_worker.exe is in the same directory as the executable
+            cmd = [os.path.join(os.path.dirname(sys.executable), 'recognition_worker.exe'), '--server']
+        else:
+            cmd = [
+                sys.executable,
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recognition_worker.py'),
+                '--server'
+            ]
+
+        # NO_WINDOW_FLAGS hides the console window on Windows
+        cls.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, text=True, encoding='utf-8',
+                                     errors='ignore', bufsize=1, creationflags=NO_WINDOW_FLAGS)
+        # Keep draining stderr (ffmpeg/JS logs) so the pipe never fills up and blocks the worker;
+        # the last lines are kept for error messages
+        cls.stderr_tail.clear()
+        cls.stderr_thread = threading.Thread(target=cls._drain_stderr, args=(cls.proc.stderr,), daemon=True)
+        cls.stderr_thread.start()
+
+    @classmethod
+    def _drain_stderr(cls, stream):
+        for line in stream:
+            cls.stderr_tail.append(line.rstrip())
+
+    def _stop_server(self):
+        """Close stdin so the worker exits, killing it if it does not"""
+        proc, RecognitionWorker.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        # Let the drain thread pick up the last lines written before exit
+        self.stderr_thread.join(timeout=1)
+
+    def _send(self, request):
+        """Queue one request in the worker, starting it if needed"""
+        self.ensure_server()
+        try:
+            self.proc.stdin.write(json.dumps(request, ensure_ascii=False) + '\n')
+            self.proc.stdin.flush()
+        except OSError:
+            # The worker died; _read_response() reports it
+            pass
+
+    def _read_response(self):
+        """Wait for the next response line ('' if the worker died)"""
+        proc = self.proc
+
+        # Kill the worker if it does not answer in time; readline then returns ''
+        timed_out = threading.Event()
+        def on_timeout():
+            timed_out.set()
+            proc.kill()
+        watchdog = threading.Timer(self.CHAPTER_TIMEOUT, on_timeout)
+        watchdog.start()
+        try:
+            line = proc.stdout.readline()
+        except (OSError, ValueError):
+            line = ''
+        finally:
+            watchdog.cancel()
+
+        if not line:
+            self._stop_server()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(proc.args, self.CHAPTER_TIMEOUT)
+        return line
+
+    def _send_batch(self, indices):
+        """Ask for all the given chapters in one request; the worker extracts them in
+        a few ffmpeg passes and answers one line per chapter, in order"""
+        self._send({
+            'mkv': self.mkv_file,
+            'starts': [self.sample_starts[i] for i in indices],
+            'duration': self.config.duration,
+            'ffmpeg': self.tools.get('ffmpeg', 'ffmpeg')
+        })
 
     def run(self):
         try:
-            self.log_message.emit("正在初始化识别引擎...")
+            self._log("正在初始化识别引擎...")
             
             total = len(self.chapters)
-            for i, chapter in enumerate(self.chapters):
+            # Sample positions are computed once; re-sends after a worker crash reuse them
+            self.sample_starts = self.config.calculate_sample_times(self.chapters)
+            # Chapters not answered yet, in order
+            pending = deque(range(total))
+            sent = False
+            while pending:
                 if not self.is_running:
-                    self.log_message.emit("⚠️ 任务已取消")
+                    self._log("⚠️ 任务已取消")
                     break
                 
-                self.log_message.emit(f"正在分析第 {i+1}/{total} 章: {chapter.title}")
-                
-                # Calculate sample time
-                start_seconds = MKVChapter.parse_time_to_seconds(chapter.start_time)
-                end_seconds = MKVChapter.parse_time_to_seconds(chapter.end_time) if chapter.end_time else None
-                
-                sample_start = self.config.calculate_sample_time(
-                    start_seconds, end_seconds
-                )
+                if not sent:
+                    self._send_batch(pending)
+                    sent = True
                 
-                # Call subprocess for recognition
-                if getattr(sys, 'frozen', False):
-                    # Running as compiled exe
-                    # Assume recognition_worker.exe is in the same directory as the executable
-                    worker_exe = os.path.join(os.path.dirname(sys.executable), 'recognition_worker.exe')
-                    cmd = [
-                        worker_exe,
-                        '--mkv', self.mkv_file,
-                        '--start', str(sample_start),
-                        '--duration', str(self.config.duration),
-                        '--ffmpeg', self.tools.get('ffmpeg', 'ffmpeg')
-                    ]
-                else:
-                    cmd = [
-                        sys.executable,
-                        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recognition_worker.py'),
-                        '--mkv', self.mkv_file,
-                        '--start', str(sample_start),
-                        '--duration', str(self.config.duration),
-                        '--ffmpeg', self.tools.get('ffmpeg', 'ffmpeg')
-                    ]
+                i = pending.popleft()
+                chapter = self.chapters[i]
+                self._log(f"正在分析第 {i+1}/{total} 章: {chapter.title}")
                 
-                # Hide window on Windows
-                startupinfo = None
-                if os.name == 'nt':
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                # Show this chapter's messages before waiting for its result
+                self._flush_log()
                 
                 # Add timeout to prevent hanging
                 try:
-                    process = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', 
-                                           startupinfo=startupinfo, timeout=30)
+                    line = self._read_response()
                 except subprocess.TimeoutExpired:
-                    self.log_message.emit(f"❌ 识别超时 (30s) - 可能原因: 网络请求阻塞或系统资源不足")
+                    self._log(f"❌ 识别超时 ({self.CHAPTER_TIMEOUT}s) - 可能原因: 网络请求阻塞或系统资源不足")
                     self.chapter_result.emit(i, None, "")
                     self.progress.emit(i + 1, total)
+                    # The rest of the batch died with the worker; send it again
+                    sent = False
                     continue
                 
-                if process.returncode == 0:
+                if not self.is_running:
+                    # stop() killed the worker while we were waiting
+                    continue
+                
+                if line:
                     try:
-                        result = json.loads(process.stdout)
+                        result = json.loads(line)
                         if result.get('success'):
                             song_info = result.get('data')
                             new_title = self.template.format(song_info)
                             
                             # Check for consecutive duplicate results
                             if i > 0 and hasattr(self, 'last_result_title') and self.last_result_title == new_title:
-                                self.log_message.emit(f"⚠️ 警告: 第 {i+1} 章识别结果与上一章完全相同 ({new_title})。可能原因: 采样位置处于两首歌之间，或视频定位不准确。建议调整采样偏移量。")
+                                self._log(f"⚠️ 警告: 第 {i+1} 章识别结果与上一章完全相同 ({new_title})。可能原因: 采样位置处于两首歌之间，或视频定位不准确。建议调整采样偏移量。")
                             
                             self.last_result_title = new_title
                             self.chapter_result.emit(i, song_info, new_title)
-                            self.log_message.emit(f"✅ 识别成功: {new_title}")
+                            self._log(f"✅ 识别成功: {new_title}")
                         else:
                             self.chapter_result.emit(i, None, "")
                             error_msg = result.get('error', '未知错误')
                             tip = ""
                             if "No match found" in error_msg:
                                 tip = " (可能原因: 歌曲未收录、片段杂音过多或太短)"
-                            self.log_message.emit(f"⚠️ 未识别到歌曲: {error_msg}{tip}")
+                            self._log(f"⚠️ 未识别到歌曲: {error_msg}{tip}")
                     except json.JSONDecodeError:
-                        self.log_message.emit(f"❌ 解析结果失败: {process.stdout} (可能原因: 脚本输出格式错误)")
+                        self._log(f"❌ 解析结果失败: {line.strip()} (可能原因: 脚本输出格式错误)")
                 else:
-                    self.log_message.emit(f"❌ 识别进程错误: {process.stderr} (可能原因: 依赖缺失或环境问题)")
+                    stderr = '\n'.join(self.stderr_tail)
+                    self._log(f"❌ 识别进程错误: {stderr} (可能原因: 依赖缺失或环境问题)")
+                    sent = False
                 
                 self.progress.emit(i + 1, total)
             
+            self._flush_log()
             if self.is_running:
                 self.finished_all.emit()
             
         except Exception as e:
+            # Responses may still be queued in the worker; start a fresh one next time
+            self._stop_server()
+            self._flush_log()
             self.error_occurred.emit(str(e))
             import traceback
             traceback.print_exc()
+        finally:
+            if not self.is_running:
+                # Reap the worker killed by stop()
+                self._stop_server()
 
     def stop(self):
         self.is_running = False
+        # Kill the worker so a pending read returns right away instead of
+        # after the current chapter (or CHAPTER_TIMEOUT); run() then exits
+        proc = self.proc
+        if proc is not None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+class ToolCheckWorker(QThread):
+    """Find and verify the external tools off the GUI thread"""
+    # detect_tools() result, or the exception it raised
+    tools_detected = Signal(object)
+
+    def run(self):
+        try:
+            detected = detect_tools()
+        except Exception as e:
+            detected = e
+        self.tools_detected.emit(detected)
 
 # ==========================================
 # Dialogs
@@ -391,6 +629,14 @@ class SettingsDialog(QDialog):
 # ==========================================
 
 class MKVChapterGUI(QMainWindow):
+    RESULT_FLUSH_MS = 100
+    # positionChanged fires far more often than the slider and label can show a
+    # difference; they are only updated when the position enters a new step
+    POSITION_STEP_MS = 100
+    # Only the most recent lines are kept; messages are written out together
+    LOG_MAX_LINES = 2000
+    LOG_FLUSH_MS = 100
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("MKV 章节自动识别工具 - 网易云API")
@@ -403,6 +649,29 @@ class MKVChapterGUI(QMainWindow):
         self.config = RecognitionConfig(strategy=SamplingStrategy.START, offset=5.0, percentage=0.5, duration=3)
         self.template = ChapterTemplate("default")
         self.player_duration = 0
+        self._position_step = -1
+        self._label_second = -1
+        self._total_label = self._format_ms(0)
+        self._preroll_pending = False
+        # Chapter manager of the current file, see _chapter_manager()
+        self._manager = None
+        self._manager_key = None
+        # Chapter backup file of the current file, set in open_file()
+        self._backup_file = None
+        
+        # Recognition results arrive one signal per chapter; they are applied to the
+        # table together, at most every RESULT_FLUSH_MS
+        self._pending_results = {}
+        self._result_timer = QTimer(self)
+        self._result_timer.setSingleShot(True)
+        self._result_timer.setInterval(self.RESULT_FLUSH_MS)
+        self._result_timer.timeout.connect(self._flush_results)
+        
+        self._log_lines = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(self.LOG_FLUSH_MS)
+        self._log_timer.timeout.connect(self._flush_log)
         
         # Initialize UI
         self.init_ui()
@@ -463,6 +732,7 @@ class MKVChapterGUI(QMainWindow):
         self.player.setVideoOutput(self.video_widget)
         self.player.positionChanged.connect(self.on_position_changed)
         self.player.durationChanged.connect(self.on_duration_changed)
+        self.player.mediaStatusChanged.connect(self.on_media_status_changed)
         
         # Controls
         controls_layout = QHBoxLayout()
@@ -511,9 +781,9 @@ class MKVChapterGUI(QMainWindow):
         right_layout = QVBoxLayout(right_panel)
         right_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["时间", "原始标题", "识别结果 (可编辑)", "状态"])
+        self.chapter_model = ChapterTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.chapter_model)
         # Allow manual resizing
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table.setColumnWidth(0, 100)
@@ -521,7 +791,9 @@ class MKVChapterGUI(QMainWindow):
         self.table.setColumnWidth(2, 250)
         self.table.setColumnWidth(3, 80)
         self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.cellClicked.connect(self.on_table_click)
+        # Uniform, fixed row heights: rows are never measured against their contents
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.clicked.connect(self.on_table_click)
         
         right_layout.addWidget(self.table)
         
@@ -544,16 +816,35 @@ class MKVChapterGUI(QMainWindow):
         v_splitter.addWidget(splitter)
         
         # Log Area
-        self.log_area = QTextEdit()
+        self.log_area = QPlainTextEdit()
         self.log_area.setReadOnly(True)
+        self.log_area.setMaximumBlockCount(self.LOG_MAX_LINES)
         v_splitter.addWidget(self.log_area)
         v_splitter.setStretchFactor(0, 4)
         v_splitter.setStretchFactor(1, 1)
         
         main_layout.addWidget(v_splitter)
+        
+        # Keyboard shortcuts, taking precedence over the table's own key handling
+        # (a cell editor still receives text and Left/Right)
+        for key, slot in ((Qt.Key_Left, self.seek_backward),
+                          (Qt.Key_Right, self.seek_forward),
+                          (Qt.Key_Up, self.volume_up),
+                          (Qt.Key_Down, self.volume_down),
+                          (Qt.Key_Space, self.toggle_play)):
+            QShortcut(QKeySequence(key), self, slot)
 
     def log(self, message):
-        self.log_area.append(message)
+        self._log_lines.append(message)
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_log(self):
+        self._log_timer.stop()
+        if not self._log_lines:
+            return
+        lines, self._log_lines = self._log_lines, []
+        self.log_area.appendPlainText('\n'.join(lines))
         # Scroll to bottom
         sb = self.log_area.verticalScrollBar()
         sb.setValue(sb.maximum())
@@ -561,12 +852,24 @@ class MKVChapterGUI(QMainWindow):
     def check_tools(self):
         self.log("正在检查依赖工具...")
         
+        # Searching PATH and running the tools can be slow; do it in the background so
+        # the window shows right away. Opening a file waits until the paths are known.
+        self.btn_open.setEnabled(False)
+        self.tool_checker = ToolCheckWorker(self)
+        self.tool_checker.tools_detected.connect(self.on_tools_detected)
+        self.tool_checker.start()
+
+    def on_tools_detected(self, detected):
+        self.btn_open.setEnabled(True)
+        
         # Capture stdout to show in log
         f = io.StringIO()
         tools = None
         try:
+            if isinstance(detected, Exception):
+                raise detected
             with contextlib.redirect_stdout(f):
-                tools = check_dependencies()
+                tools = check_dependencies(detected)
         except Exception as e:
             self.log(f"❌ 检查工具时发生错误: {e}")
         
@@ -578,6 +881,11 @@ class MKVChapterGUI(QMainWindow):
                 
         if tools:
             self.tools = tools
+            # Load the recognition engine while the user picks a file
+            try:
+                RecognitionWorker.ensure_server()
+            except OSError as e:
+                self.log(f"⚠️ 无法预先启动识别进程: {e}")
         else:
             QMessageBox.critical(self, "错误", "缺少必要工具，请查看日志窗口获取详细信息。\n\n请确保安装了 FFmpeg 和 MKVToolNix。")
 
@@ -585,24 +893,33 @@ class MKVChapterGUI(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "打开 MKV 文件", "", "MKV Files (*.mkv)")
         if file_path:
             self.mkv_file = file_path
+            self._backup_file = Path(file_path).with_suffix('.chapters.backup.json')
             self.load_mkv()
 
+    def _chapter_manager(self):
+        """MKVChapterManager for the current file, created once per file and tool paths"""
+        key = (self.mkv_file,
+               str(self.tools.get('mkvextract', 'mkvextract')),
+               str(self.tools.get('mkvpropedit', 'mkvpropedit')))
+        if self._manager_key != key:
+            self._manager = MKVChapterManager(str(self.mkv_file), mkvextract_path=key[1],
+                                              mkvpropedit_path=key[2])
+            self._manager_key = key
+        return self._manager
+
     def load_mkv(self):
         self.log(f"正在加载: {self.mkv_file}")
+        # The first frame is shown once the media has loaded (see on_media_status_changed)
+        self._preroll_pending = True
+        self._position_step = -1
         self.player.setSource(QUrl.fromLocalFile(self.mkv_file))
-        self.player.play()
-        self.player.pause()
         self.btn_play.setText("▶")
         
         # Load chapters
         try:
             if not self.mkv_file:
                 return
-            manager = MKVChapterManager(
-                str(self.mkv_file), 
-                mkvextract_path=str(self.tools.get('mkvextract', 'mkvextract')),
-                mkvpropedit_path=str(self.tools.get('mkvpropedit', 'mkvpropedit'))
-            )
+            manager = self._chapter_manager()
             self.chapters = manager.extract_chapters()
             self.populate_table()
             self.btn_recognize_all.setEnabled(True)
@@ -615,36 +932,28 @@ class MKVChapterGUI(QMainWindow):
             QMessageBox.warning(self, "错误", f"加载章节失败: {e}")
 
     def populate_table(self):
-        self.table.setRowCount(len(self.chapters))
-        for i, chapter in enumerate(self.chapters):
-            # Time
-            self.table.setItem(i, 0, QTableWidgetItem(chapter.start_time))
-            
-            # Original Title
-            self.table.setItem(i, 1, QTableWidgetItem(chapter.title))
-            
-            # Recognized Title (Editable)
-            item_rec = QTableWidgetItem("")
-            self.table.setItem(i, 2, item_rec)
-            
-            # Status
-            self.table.setItem(i, 3, QTableWidgetItem("待处理"))
+        # Results still pending belong to the previous chapter list
+        self._result_timer.stop()
+        self._pending_results.clear()
+        # Chapter start positions in milliseconds (-1 if unparsable), parsed once for seeking
+        self._chapter_ms = array('q', map(self._start_ms, self.chapters))
+        self.chapter_model.set_chapters(self.chapters)
 
-    def on_table_click(self, row, col):
-        # Seek video to chapter start
-        time_str = self.table.item(row, 0).text()
-        # Parse time string (00:00:00.000) to milliseconds
+    @staticmethod
+    def _start_ms(chapter):
         try:
-            parts = time_str.split(':')
-            h = int(parts[0])
-            m = int(parts[1])
-            s = float(parts[2])
-            ms = int((h * 3600 + m * 60 + s) * 1000)
-            self.player.setPosition(ms)
-            self.player.play()
-            self.btn_play.setText("⏸")
-        except:
-            pass
+            return int(MKVChapter.parse_time_to_seconds(chapter.start_time) * 1000)
+        except (ValueError, AttributeError):
+            return -1
+
+    def on_table_click(self, index):
+        # Seek video to chapter start
+        ms = self._chapter_ms[index.row()]
+        if ms < 0:
+            return
+        self.player.setPosition(ms)
+        self.player.play()
+        self.btn_play.setText("⏸")
 
     def toggle_play(self):
         if self.player.playbackState() == QMediaPlayer.PlayingState:
@@ -655,11 +964,25 @@ class MKVChapterGUI(QMainWindow):
             self.btn_play.setText("⏸")
 
     def on_position_changed(self, position):
+        step = position // self.POSITION_STEP_MS
+        if step == self._position_step:
+            return
+        self._position_step = step
         self.slider.setValue(position)
         self.update_time_label()
 
+    def on_media_status_changed(self, status):
+        # Pausing a stopped player prerolls the first frame without starting playback
+        # (no audio blip); skipped if the user already started playing
+        if status == QMediaPlayer.LoadedMedia and self._preroll_pending:
+            self._preroll_pending = False
+            if self.player.playbackState() == QMediaPlayer.StoppedState:
+                self.player.pause()
+
     def on_duration_changed(self, duration):
         self.player_duration = duration
+        self._total_label = self._format_ms(duration)
+        self._label_second = -1
         self.slider.setRange(0, duration)
         self.update_time_label()
 
@@ -669,16 +992,18 @@ class MKVChapterGUI(QMainWindow):
     def set_volume(self, volume):
         self.audio_output.setVolume(volume / 100.0)
 
+    @staticmethod
+    def _format_ms(ms):
+        m, s = divmod(ms // 1000, 60)
+        return f"{m:02d}:{s:02d}"
+
     def update_time_label(self):
-        def fmt(ms):
-            s = ms // 1000
-            m = s // 60
-            s = s % 60
-            return f"{m:02d}:{s:02d}"
-        
-        current = fmt(self.player.position())
-        total = fmt(self.player_duration)
-        self.lbl_time.setText(f"{current} / {total}")
+        # The label shows whole seconds; the total is formatted when the duration changes
+        second = self.player.position() // 1000
+        if second == self._label_second:
+            return
+        self._label_second = second
+        self.lbl_time.setText(f"{self._format_ms(second * 1000)} / {self._total_label}")
 
     def seek_backward(self):
         """Rewind 0.5 seconds"""
@@ -694,22 +1019,6 @@ class MKVChapterGUI(QMainWindow):
     def volume_down(self):
         self.volume_slider.setValue(max(0, self.volume_slider.value() - 5))
 
-    def keyPressEvent(self, event):
-        # Handle keyboard shortcuts
-        # Note: If a widget like QTableWidget has focus, it might consume arrow keys first.
-        if event.key() == Qt.Key_Left:
-            self.seek_backward()
-        elif event.key() == Qt.Key_Right:
-            self.seek_forward()
-        elif event.key() == Qt.Key_Up:
-            self.volume_up()
-        elif event.key() == Qt.Key_Down:
-            self.volume_down()
-        elif event.key() == Qt.Key_Space:
-            self.toggle_play()
-        else:
-            super().keyPressEvent(event)
-
     def open_settings(self):
         dialog = SettingsDialog(self, self.config, self.template)
         if dialog.exec():
@@ -762,21 +1071,24 @@ class MKVChapterGUI(QMainWindow):
             self.progress_bar.setValue(current)
 
     def update_chapter_result(self, index, song_info, new_title):
-        if new_title:
-            self.table.item(index, 2).setText(new_title)
-            self.table.item(index, 3).setText("✅ 成功")
-            self.table.item(index, 3).setForeground(QBrush(QColor("#00ff00")))
-        else:
-            self.table.item(index, 3).setText("❌ 失败")
-            self.table.item(index, 3).setForeground(QBrush(QColor("#ff0000")))
+        self._pending_results[index] = new_title
+        if not self._result_timer.isActive():
+            self._result_timer.start()
+
+    def _flush_results(self):
+        self._result_timer.stop()
+        results, self._pending_results = self._pending_results, {}
+        self.chapter_model.set_results(results)
 
     def recognition_finished(self):
+        self._flush_results()
         if hasattr(self, 'progress_bar') and self.progress_bar:
             self.progress_bar.close()
         self.log("🎉 所有识别任务完成")
         QMessageBox.information(self, "完成", "识别完成，请检查结果并保存")
 
     def on_worker_error(self, error_msg):
+        self._flush_results()
         self.log(f"❌ 发生严重错误: {error_msg}")
         if hasattr(self, 'progress_bar') and self.progress_bar:
             self.progress_bar.close()
@@ -786,35 +1098,36 @@ class MKVChapterGUI(QMainWindow):
         if not self.mkv_file:
             return
             
-        # Gather chapters from table
-        new_chapters = []
-        for i in range(self.table.rowCount()):
+        # Gather chapters from table (including results not shown yet)
+        self._flush_results()
+        changed_rows = self.chapter_model.changed_rows
+        if not changed_rows:
+            self.log("ℹ️ 章节标题没有变化，无需保存")
+            QMessageBox.information(self, "提示", "章节标题没有变化，无需保存。")
+            return
+        
+        # Only rows with a new title get a new chapter, the others are written as they are
+        new_chapters = list(self.chapters)
+        for i in changed_rows:
             original_chapter = self.chapters[i]
-            new_title = self.table.item(i, 2).text()
-            
-            # Use new title if available, else keep original
-            final_title = new_title if new_title.strip() else original_chapter.title
-            
-            new_chapter = MKVChapter(
+            new_chapters[i] = MKVChapter(
                 uid=original_chapter.uid,
                 start_time=original_chapter.start_time,
                 end_time=original_chapter.end_time,
-                title=final_title
+                title=self.chapter_model.titles[i]
             )
-            new_chapters.append(new_chapter)
             
         # Save
         try:
-            manager = MKVChapterManager(
-                str(self.mkv_file), 
-                mkvextract_path=str(self.tools.get('mkvextract', 'mkvextract')),
-                mkvpropedit_path=str(self.tools.get('mkvpropedit', 'mkvpropedit'))
-            )
+            manager = self._chapter_manager()
             # Backup first
             # We can reuse the backup logic from the script if we import MKVAutoRename or just implement it here
             # Let's just call update_chapters, assuming user wants to save what they see
             
             manager.update_chapters(new_chapters, str(self.mkv_file))
+            # Later changes are compared against what is now in the file
+            self.chapters = new_chapters
+            self.chapter_model.set_saved_chapters(new_chapters)
             self.log(f"💾 章节已保存到文件: {self.mkv_file}")
             QMessageBox.information(self, "成功", f"章节信息已成功保存到文件:\n{self.mkv_file}")
         except Exception as e:
@@ -826,12 +1139,11 @@ class MKVChapterGUI(QMainWindow):
             return
             
         try:
-            from auto_rename_mkv_chapters import MKVAutoRename
+            backup_file = self._backup_file
             MKVAutoRename.restore_from_backup(
-                str(self.mkv_file), 
+                str(self.mkv_file), str(backup_file),
                 mkvpropedit_path=str(self.tools.get('mkvpropedit', 'mkvpropedit'))
             )
-            backup_file = Path(self.mkv_file).with_suffix('.chapters.backup.json')
             self.log(f"✅ 已从备份文件还原: {backup_file}")
             self.load_mkv() # Reload
             QMessageBox.information(self, "成功", f"已从以下备份文件还原:\n{backup_file}")
@@ -845,14 +1157,10 @@ class MKVChapterGUI(QMainWindow):
             
         try:
             # Re-read chapters from file to ensure we backup what is actually on disk
-            manager = MKVChapterManager(
-                str(self.mkv_file), 
-                mkvextract_path=str(self.tools.get('mkvextract', 'mkvextract')),
-                mkvpropedit_path=str(self.tools.get('mkvpropedit', 'mkvpropedit'))
-            )
+            manager = self._chapter_manager()
             current_chapters = manager.extract_chapters()
             
-            backup_file = Path(self.mkv_file).with_suffix('.chapters.backup.json')
+            backup_file = self._backup_file
             
             # Check if exists
             if backup_file.exists():
@@ -875,7 +1183,7 @@ class MKVChapterGUI(QMainWindow):
             ]
             
             with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(chapters_data, f, ensure_ascii=False, indent=2)
+                f.write(json.dumps(chapters_data, ensure_ascii=False, indent=2))
                 
             self.log(f"✅ 已备份当前章节到: {backup_file}")
             QMessageBox.information(self, "成功", f"已创建备份文件:\n{backup_file}")
@@ -3,9 +3,21 @@ import os
 import json
 import argparse
 import contextlib
+import queue
+import threading
+import traceback
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# Redirect stdout to stderr to prevent pollution of JSON output
-# We keep stderr for logs
+# JSON results go to a private duplicate of the original stdout; fd 1 itself is pointed
+# at stderr, so prints and native writes (e.g. from the JS engine) only reach the logs
+# and can never end up between result lines. Works the same on Windows and POSIX.
+try:
+    RESULTS = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    os.dup2(2, 1)
+except OSError:
+    RESULTS = None
 sys.stdout = sys.stderr
 
 # Add current directory to path
@@ -16,50 +28,224 @@ try:
 except ImportError:
     pass
 
+# Full tracebacks for per-chapter failures only when debugging (MKVCIR_DEBUG=1);
+# otherwise one line each, so they do not flood the log the GUI keeps
+DEBUG = os.environ.get('MKVCIR_DEBUG') == '1'
+
+def log_error(e):
+    """Log a failure that is also reported back in the result"""
+    if DEBUG:
+        traceback.print_exc()
+    else:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+
+def start_recognition(recognizer, samples):
+    """
+    Start recognizing extracted samples.
+    Returns a finished result dict, or a Future to pass to finish().
+    """
+    if samples:
+        # Fingerprint now, the network lookup runs in the background
+        return recognizer.submit_recognition(samples)
+    return {"success": False, "error": "Failed to extract audio samples"}
+
+def submit(recognizer, mkv, start, duration):
+    """Extract one sample and start its recognition (see start_recognition())"""
+    try:
+        # Extract
+        # This might print to stdout/stderr
+        return start_recognition(recognizer, recognizer.extract_audio_sample(mkv, start, duration))
+    except Exception as e:
+        log_error(e)
+        return {"success": False, "error": str(e)}
+
+def submit_batch(recognizer, mkv, starts, duration):
+    """
+    Like submit() for many positions of one file, yielded in order.
+    Each group of BATCH_SIZE samples comes from a single ffmpeg run, so the
+    container is opened once per group instead of once per chapter.
+    Up to MAX_PARALLEL_BATCHES groups are extracted in the background while
+    earlier groups are fingerprinted on this thread.
+    """
+    groups = [starts[offset:offset + recognizer.BATCH_SIZE]
+              for offset in range(0, len(starts), recognizer.BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=recognizer.MAX_PARALLEL_BATCHES,
+                            thread_name_prefix='ffmpeg') as pool:
+        # Bounded window: decoded samples of far-ahead groups would only sit in memory
+        extracting = deque()
+        next_group = iter(groups)
+        for group in itertools.islice(next_group, recognizer.MAX_PARALLEL_BATCHES):
+            extracting.append(pool.submit(recognizer.extract_audio_samples_group, mkv, group, duration))
+        try:
+            for group in groups:
+                future = extracting.popleft()
+                following = next(next_group, None)
+                if following is not None:
+                    extracting.append(pool.submit(recognizer.extract_audio_samples_group,
+                                                  mkv, following, duration))
+                try:
+                    samples_list = future.result()
+                except Exception as e:
+                    log_error(e)
+                    samples_list = [e] * len(group)
+                for samples in samples_list:
+                    if isinstance(samples, Exception):
+                        yield {"success": False, "error": str(samples)}
+                        continue
+                    try:
+                        yield start_recognition(recognizer, samples)
+                    except Exception as e:
+                        yield {"success": False, "error": str(e)}
+        finally:
+            # Closed early (the GUI went away): do not start the groups still queued
+            for future in extracting:
+                future.cancel()
+
+def finish(recognizer, pending):
+    """Wait for a submit() result and turn it into the JSON-able result dict"""
+    if isinstance(pending, dict):
+        return pending
+    info = recognizer.resolve_recognition(pending)
+    if info:
+        return {"success": True, "data": info}
+    return {"success": False, "error": "No match found"}
+
+def recognize(recognizer, mkv, start, duration):
+    """Extract one sample and recognize it, returning the JSON-able result dict"""
+    return finish(recognizer, submit(recognizer, mkv, start, duration))
+
+def real_stdout():
+    """Where results are written: the original stdout, as utf-8 to handle special characters on Windows"""
+    if RESULTS is not None:
+        return RESULTS
+    out = sys.__stdout__
+    try:
+        out.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+    return out
+
+# Requests whose network lookup may be in flight while the next sample is extracted
+PIPELINE_DEPTH = 3
+
+def write_results(pending, out, closed):
+    """
+    Writer stage: resolve submitted requests in order and emit one JSON line each.
+    If the GUI has gone away (broken pipe), sets `closed` and keeps draining the
+    queue without answering, so serve() is never left blocked on a full queue.
+    """
+    while True:
+        item = pending.get()
+        if item is None:
+            break
+        if closed.is_set():
+            continue
+        recognizer, submitted = item
+        try:
+            result = finish(recognizer, submitted)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        try:
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+        except (OSError, ValueError) as e:
+            log_error(e)
+            closed.set()
+
+def serve():
+    """
+    Serve requests until stdin closes: one JSON request per line in
+    ({"mkv", "start", "duration", "ffmpeg"}), one JSON result per line out, in order.
+    A request may give "starts" (a list) instead of "start"; it then gets one
+    result line per position, extracted in batches (see submit_batch()).
+    The JS engine and pyncm are loaded once instead of once per chapter.
+
+    Extraction and fingerprinting run on this thread while a writer thread waits
+    for the network lookups, so later chapters are already being extracted while
+    chapter N is being looked up.
+    """
+    # Bounded so extraction never runs more than PIPELINE_DEPTH requests ahead
+    pending = queue.Queue(maxsize=PIPELINE_DEPTH)
+    # Set by the writer once results can no longer be delivered; no more work is started
+    closed = threading.Event()
+    writer = threading.Thread(target=write_results, args=(pending, real_stdout(), closed))
+    writer.start()
+    afp = None
+    recognizers = {}
+    try:
+        # Load the JS engine before the first request; the GUI starts the server ahead
+        # of time so this is done by then. On failure it is retried per request
+        # Note: AFPInstance uses pythonmonkey which might print things or use stderr
+        afp = AFPInstance()
+    except Exception as e:
+        log_error(e)
+
+    try:
+        for line in sys.stdin:
+            if closed.is_set():
+                break
+            if not line.strip():
+                continue
+            recognizer = None
+            req = None
+            try:
+                req = json.loads(line)
+                if afp is None:
+                    afp = AFPInstance()
+                ffmpeg = req.get('ffmpeg', 'ffmpeg')
+                if ffmpeg not in recognizers:
+                    recognizers[ffmpeg] = AudioRecognizer(afp, ffmpeg_path=ffmpeg)
+                recognizer = recognizers[ffmpeg]
+                duration = int(req.get('duration', 3))
+                if 'starts' in req:
+                    with contextlib.closing(submit_batch(recognizer, req['mkv'],
+                                                         [float(t) for t in req['starts']],
+                                                         duration)) as batch:
+                        for submitted in batch:
+                            if closed.is_set():
+                                break
+                            pending.put((recognizer, submitted))
+                    continue
+                pending.put((recognizer, submit(recognizer, req['mkv'], float(req['start']), duration)))
+            except Exception as e:
+                log_error(e)
+                # Still answer once per requested position so the client stays in step
+                starts = req.get('starts') if isinstance(req, dict) else None
+                for _ in range(len(starts) if isinstance(starts, list) else 1):
+                    pending.put((recognizer, {"success": False, "error": str(e)}))
+    finally:
+        pending.put(None)
+        writer.join()
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--mkv', required=True)
-    parser.add_argument('--start', type=float, required=True)
+    parser.add_argument('--server', action='store_true',
+                        help='read newline-delimited JSON requests from stdin')
+    parser.add_argument('--mkv')
+    parser.add_argument('--start', type=float)
     parser.add_argument('--duration', type=int, default=3)
     parser.add_argument('--ffmpeg', default='ffmpeg')
     args = parser.parse_args()
 
-    result = {"success": False, "error": "Unknown error"}
+    if args.server:
+        serve()
+        return
+    if args.mkv is None or args.start is None:
+        parser.error('--mkv and --start are required unless --server is given')
 
     try:
         # Initialize
-        # Note: AFPInstance uses pythonmonkey which might print things or use stderr
         afp = AFPInstance()
         recognizer = AudioRecognizer(afp, ffmpeg_path=args.ffmpeg)
-        
-        # Extract
-        # This might print to stdout/stderr
-        samples = recognizer.extract_audio_sample(args.mkv, args.start, args.duration)
-        
-        if samples:
-            # Recognize
-            info = recognizer.recognize_song(samples)
-            if info:
-                result = {"success": True, "data": info}
-            else:
-                result = {"success": False, "error": "No match found"}
-        else:
-            result = {"success": False, "error": "Failed to extract audio samples"}
-            
+        result = recognize(recognizer, args.mkv, args.start, args.duration)
     except Exception as e:
         result = {"success": False, "error": str(e)}
-        import traceback
-        traceback.print_exc()
+        log_error(e)
 
     # Print JSON result to the REAL stdout
-    sys.stdout = sys.__stdout__
-    try:
-        # Force stdout to use utf-8 encoding to handle special characters on Windows
-        sys.stdout.reconfigure(encoding='utf-8')
-    except Exception:
-        pass
-        
-    print(json.dumps(result, ensure_ascii=False))
+    out = real_stdout()
+    print(json.dumps(result, ensure_ascii=False), file=out)
+    out.flush()
 
 if __name__ == '__main__':
     main()